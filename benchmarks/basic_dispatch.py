@@ -0,0 +1,57 @@
+"""
+benchmarks/basic_dispatch.py
+Step throughput of the BASIC run loop on long programs
+
+Usage: python -m benchmarks.basic_dispatch
+"""
+
+import time
+
+import interpreters.basic as basic
+
+SIZES = [10_000, 100_000]
+
+def sequential_program(size):
+    """
+    Generate a program of LET statements executed top to bottom.
+    Args:
+        size (int): Number of lines in the program.
+    Returns:
+        str: The BASIC source code.
+    """
+    lines = ["10 LET A = 0"]
+    for i in range(1, size):
+        lines.append(f"{(i + 1) * 10} LET A = A + 1")
+    return '\n'.join(lines)
+
+def goto_program(size):
+    """
+    Generate a program where every line jumps to the next one with GOTO.
+    Args:
+        size (int): Number of lines in the program.
+    Returns:
+        str: The BASIC source code.
+    """
+    lines = []
+    for i in range(size - 1):
+        lines.append(f"{(i + 1) * 10} GOTO {(i + 2) * 10}")
+    lines.append(f"{size * 10} REM end")
+    return '\n'.join(lines)
+
+def bench(name, code, size):
+    """
+    Load and execute a program, reporting steps per second.
+    """
+    interpreter = basic.BasicInterpreter()
+    interpreter.load(code)
+
+    start = time.perf_counter()
+    interpreter.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:>10} {size:>8} lines: {elapsed:8.3f}s  {size / elapsed:12,.0f} steps/s")
+
+if __name__ == "__main__":
+    for size in SIZES:
+        bench("sequential", sequential_program(size), size)
+        bench("goto", goto_program(size), size)
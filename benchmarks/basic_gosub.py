@@ -0,0 +1,56 @@
+"""
+benchmarks/basic_gosub.py
+Call overhead of GOSUB/RETURN against subroutines emulated with GOTO and a return variable
+
+Usage: python -m benchmarks.basic_gosub
+"""
+
+import time
+
+import interpreters.basic as basic
+
+CALLS = 100_000
+
+PROGRAMS = {
+    # The caller stores a return address in R and the subroutine dispatches on it with IF chains
+    "goto": f"""
+10 LET S = 0
+20 FOR I = 1 TO {CALLS}
+30 LET R = 1
+40 GOTO 1000
+50 NEXT I
+60 END
+1000 LET S = S + I
+1010 IF R == 1 GOTO 50
+1020 IF R == 2 GOTO 60
+""",
+    "gosub": f"""
+10 LET S = 0
+20 FOR I = 1 TO {CALLS}
+30 GOSUB 1000
+40 NEXT I
+50 END
+1000 LET S = S + I
+1010 RETURN
+""",
+}
+
+def bench(name, code, engine, optimize):
+    """
+    Load and execute a program, reporting the time per call.
+    """
+    interpreter = basic.BasicInterpreter(engine=engine, optimize=optimize)
+    interpreter.load(code.strip())
+
+    start = time.perf_counter()
+    interpreter.run()
+    elapsed = time.perf_counter() - start
+
+    label = f"{name} -O" if optimize else name
+    print(f"{engine:>8} {label:>10}: {elapsed:8.3f}s  {elapsed / CALLS * 1e9:8.0f} ns/call  {interpreter.steps:>8} steps")
+
+if __name__ == "__main__":
+    for engine in basic.ENGINES:
+        bench("goto", PROGRAMS["goto"], engine, False)
+        bench("gosub", PROGRAMS["gosub"], engine, False)
+        bench("gosub", PROGRAMS["gosub"], engine, True)
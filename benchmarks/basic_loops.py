@@ -0,0 +1,54 @@
+"""
+benchmarks/basic_loops.py
+Time of FOR/NEXT and WHILE/WEND loops against the same loop written with IF and GOTO
+
+Usage: python -m benchmarks.basic_loops
+"""
+
+import time
+
+import interpreters.basic as basic
+
+ITERATIONS = 200_000
+
+PROGRAMS = {
+    "goto": f"""
+10 LET S = 0
+20 LET I = 1
+30 LET S = S + I
+40 LET I = I + 1
+50 IF I <= {ITERATIONS} GOTO 30
+""",
+    "for/next": f"""
+10 LET S = 0
+20 FOR I = 1 TO {ITERATIONS}
+30 LET S = S + I
+40 NEXT I
+""",
+    "while/wend": f"""
+10 LET S = 0
+20 LET I = 1
+30 WHILE I <= {ITERATIONS}
+40 LET S = S + I
+50 LET I = I + 1
+60 WEND
+""",
+}
+
+def bench(name, code, engine):
+    """
+    Load and execute a program, reporting the time per loop iteration.
+    """
+    interpreter = basic.BasicInterpreter(engine=engine)
+    interpreter.load(code.strip())
+
+    start = time.perf_counter()
+    interpreter.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"{engine:>8} {name:>10}: {elapsed:8.3f}s  {elapsed / ITERATIONS * 1e9:8.0f} ns/iteration  {interpreter.steps:>8} steps")
+
+if __name__ == "__main__":
+    for engine in basic.ENGINES:
+        for name, code in PROGRAMS.items():
+            bench(name, code, engine)
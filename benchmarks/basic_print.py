@@ -0,0 +1,40 @@
+"""
+benchmarks/basic_print.py
+PRINT throughput of the BASIC output sinks
+
+Usage: python -m benchmarks.basic_print
+"""
+
+import os
+import time
+
+import interpreters.basic as basic
+import interpreters.basic.streams as streams
+
+LINES = 200_000
+
+PROGRAM = f"""10 LET A = 0
+20 PRINT A
+30 LET A = A + 1
+40 IF A < {LINES} GOTO 20
+"""
+
+def bench(name, make_sink, engine):
+    """
+    Run the PRINT loop with a fresh sink, reporting lines per second.
+    """
+    with open(os.devnull, 'w') as devnull:
+        interpreter = basic.BasicInterpreter(engine=engine, output=make_sink(devnull))
+        interpreter.load(PROGRAM)
+
+        start = time.perf_counter()
+        interpreter.run()
+        elapsed = time.perf_counter() - start
+
+    print(f"{name:>9} {engine:>8}: {elapsed:8.3f}s  {LINES / elapsed:12,.0f} lines/s")
+
+if __name__ == "__main__":
+    for engine in basic.ENGINES:
+        bench("echo", streams.EchoSink, engine)
+        bench("buffered", streams.BufferedSink, engine)
+        bench("memory", lambda devnull: streams.MemorySink(), engine)
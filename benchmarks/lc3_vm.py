@@ -0,0 +1,94 @@
+"""
+benchmarks/lc3_vm.py
+Instruction throughput of the LC-3 VM, in millions of instructions per second
+
+Usage: python -m benchmarks.lc3_vm
+"""
+
+import io
+import time
+
+from interpreters.lc3.assembler import assemble
+from interpreters.lc3.console import Console
+from interpreters.lc3.environment import Machine
+from interpreters.lc3.vm import VM
+
+# Nested counting loops: mostly ADD and BR
+ARITHMETIC = """
+        .ORIG x3000
+        AND R0, R0, #0
+        LD R1, OUTER_N
+OUTER   LD R2, INNER_N
+INNER   ADD R0, R0, #1
+        ADD R2, R2, #-1
+        BRp INNER
+        ADD R1, R1, #-1
+        BRp OUTER
+        HALT
+OUTER_N .FILL #1000
+INNER_N .FILL #1000
+        .END
+"""
+
+# Copies a buffer back and forth: loads, stores and the decode cache resets they cause
+MEMORY = """
+        .ORIG x3000
+        LD R1, PASSES
+PASS    LEA R2, SOURCE
+        LD R3, TARGET
+        LD R4, LENGTH
+COPY    LDR R5, R2, #0
+        STR R5, R3, #0
+        ADD R2, R2, #1
+        ADD R3, R3, #1
+        ADD R4, R4, #-1
+        BRp COPY
+        ADD R1, R1, #-1
+        BRp PASS
+        HALT
+PASSES  .FILL #1000
+LENGTH  .FILL #256
+TARGET  .FILL x4000
+SOURCE  .BLKW #256 x1234
+        .END
+"""
+
+# Prints a line with PUTS and one with OUT per character: console buffering and string slicing
+OUTPUT = """
+        .ORIG x3000
+        LD R1, LINES
+LINE    LEA R0, TEXT
+        PUTS
+        LEA R2, TEXT
+CHAR    LDR R0, R2, #0
+        BRz NEXT
+        OUT
+        ADD R2, R2, #1
+        BRnzp CHAR
+NEXT    ADD R1, R1, #-1
+        BRp LINE
+        HALT
+LINES   .FILL #10000
+TEXT    .STRINGZ "The quick brown fox jumps over the lazy dog\\n"
+        .END
+"""
+
+def bench(name, source):
+    """
+    Assemble and run a program, reporting instructions per second.
+    """
+    # Console output is buffered into memory, so the terminal is not measured
+    machine = Machine(Console("", stream=io.StringIO()))
+    vm = VM(machine)
+    vm.load(assemble(source))
+
+    start = time.perf_counter()
+    vm.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:>10}: {vm.steps:>10,} instructions in {elapsed:7.3f}s  {vm.steps / elapsed / 1e6:6.2f} MIPS")
+
+if __name__ == "__main__":
+    bench("arithmetic", ARITHMETIC)
+    bench("memory", MEMORY)
+    bench("output", OUTPUT)
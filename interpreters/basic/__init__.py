@@ -4,38 +4,621 @@ interpreters - basic
 BASIC interpreter
 """
 
-import click, json
+import bisect, click, re, signal, time
+import interpreters.basic.cache as cache
+import interpreters.basic.checkpoint as checkpoint
 import interpreters.basic.classes as classes
+import interpreters.basic.optimizer as optimizer
+import interpreters.basic.profiler as profiler
+import interpreters.basic.trace as trace
+import interpreters.basic.streams as streams
 
-environment = {
-    "__program_counter": 0,
-    "__verbose": False,
-    "__input": None,
-    "__internal_test_mode": False
-}
-
-program = {}
+ENGINES = ["tree", "compiled"]
 
-parse_line_number = 0
+# Lines executed between checks for an interrupted run or exceeded limits
+RUN_CHUNK = 1000
 
-def run(file, verbose=False):
+def run(file, verbose=False, engine="tree", optimize=False, use_cache=True, buffer_size=8192, input=None,
+        max_steps=None, max_time=None, profile=None, profile_output=None, resume=None, checkpoint_file=None):
     """
     Run the BASIC interpreter on the given file.
     Args:
         file (str): The path to the BASIC file to run.
         verbose (bool): If True, enable verbose output.
+        engine (str): "tree" to walk the parsed program, or "compiled" to compile it to closures first.
+        optimize (bool): If True, fold constant expressions before running.
+        use_cache (bool): If True, reuse and update the parsed program cache of the file.
+        buffer_size (int): Characters of PRINT output to buffer before writing, or 0 to write each line immediately.
+        input (InputSource): The source of INPUT values, or None to prompt on the terminal.
+        max_steps (int): The maximum number of lines to execute, or None for no limit.
+        max_time (float): The maximum wall-clock time in seconds, or None for no limit.
+        profile (str): Profile the run and write a report in this format, one of profiler.FORMATS.
+        profile_output (file): The stream to write the profile to, or None for stderr.
+        resume (str): The path of a checkpoint to continue the run from, or None to start from the beginning.
+        checkpoint_file (str): The path to save a checkpoint to if the run stops before finishing, or None.
+            SIGTERM and SIGINT then stop the run cleanly so it can be checkpointed.
+    Returns:
+        BasicInterpreter: The interpreter of the finished run.
+    """
+    # Verbose output is echoed directly, so PRINT must not be buffered behind it
+    if verbose or buffer_size <= 0:
+        output = streams.EchoSink()
+    else:
+        output = streams.BufferedSink(buffer_size=buffer_size)
+
+    interpreter = BasicInterpreter(verbose=verbose, engine=engine, optimize=optimize, output=output, input=input)
+    if profile is not None:
+        interpreter.profiler = profiler.Profiler()
+
+    if checkpoint_file is not None:
+        def stop(signal_number, frame):
+            interpreter.environment.running = False
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+    try:
+        interpreter.load_file(file, use_cache=use_cache)
+        if resume is None:
+            result = interpreter.run(max_steps=max_steps, max_time=max_time)
+        else:
+            interpreter.restore(checkpoint.load(resume, file))
+            result = interpreter.resume(max_steps=max_steps, max_time=max_time)
+    except classes.BasicError as e:
+        click.echo(e, err=True)
+        exit(1)
+    finally:
+        if profile is not None:
+            click.echo(interpreter.profiler.format(interpreter.program, profile), file=profile_output, err=profile_output is None)
+
+    if checkpoint_file is not None and result.status != classes.RunResult.FINISHED:
+        checkpoint.save(checkpoint_file, file, interpreter.checkpoint())
+        click.echo(f"{result.message()} Checkpoint saved to {checkpoint_file}.", err=True)
+        exit(1)
+
+    if result.limit_exceeded:
+        click.echo(result.message(), err=True)
+        exit(1)
+
+    return interpreter
+
+class BasicInterpreter:
+    """
+    A self-contained BASIC interpreter.
+
+    Each interpreter owns its program, variables, I/O streams and counters,
+    so several can run in one process, from different threads, or embedded
+    in a service. Errors are raised as BasicError rather than exiting.
+
+    Attributes:
+        environment (Environment): The registers, variables and I/O streams of the program.
+        program (dict): Mapping of line numbers to Line objects.
+        engine (str): "tree" to walk the parsed program, or "compiled" to compile it to closures first.
+        optimize (bool): If True, fold constant expressions of loaded programs.
+        steps (int): The number of lines executed since the last reset.
+        profiler (Profiler): Collects per-line hits and times when set, or None to run unprofiled.
+        tracer (Tracer): Receives line, statement, assignment and jump events when set, or None to run untraced.
+            Runs with both a profiler and a tracer are traced, and their profile includes the tracing time.
     """
-    global environment
 
-    if verbose:
-        environment['__verbose'] = True
+    def __init__(self, verbose=False, engine="tree", optimize=False, output=None, input=None, tracer=None):
+        """
+        Args:
+            verbose (bool): If True, enable verbose output. Runs are traced by an EchoTracer unless another tracer is given.
+            engine (str): The execution engine, one of ENGINES.
+            optimize (bool): If True, fold constant expressions of loaded programs.
+            output (OutputSink): The sink PRINT writes to. A plain stream, or None for stdout, is echoed to line by line.
+            input (InputSource): The source INPUT reads values from. A stream is read line by line, an iterable value by value, and None prompts on the terminal.
+            tracer (Tracer): The tracer to send run events to, or None.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+
+        self.environment = classes.Environment(verbose=verbose, output=output, input=input)
+        self.program = {}
+        self.engine = engine
+        self.optimize = optimize
+        self.steps = 0
+        self.profiler = None
+        self.tracer = tracer if tracer is not None or not verbose else trace.EchoTracer()
+
+        # Sorted line numbers and jump table, kept up to date as lines are edited
+        self._line_numbers = []
+        self._line_index = build_line_index(self._line_numbers)
+        self._linked = False
+
+        # Compiled code, and the lines replaced since it was compiled
+        self._code = None
+        self._changed = set()
+
+    def __repr__(self):
+        return f"BasicInterpreter({self.engine}, {len(self.program)} lines, {self.steps} steps)"
+
+    def load(self, code):
+        """
+        Load a program from BASIC source code, replacing the current one.
+        Args:
+            code (str): The BASIC source code.
+        """
+        self.clear()
+        self._set_program(load_program(code, self.environment))
+
+    def load_file(self, file, use_cache=True):
+        """
+        Load a program from a BASIC file, replacing the current one.
+        Args:
+            file (str): The path to the BASIC file.
+            use_cache (bool): If True, reuse and update the parsed program cache of the file.
+        """
+        self.clear()
+        self._set_program(load_file(file, self.environment, use_cache=use_cache))
+
+    def add_line(self, line):
+        """
+        Parse a line of BASIC code into the program, replacing any line with the same number.
+
+        Only the edited line is parsed. A replaced line is recompiled on the
+        next run, while a new line is slotted into the sorted line order and
+        shifts the jump table entries after it.
+        Args:
+            line (str): A line of BASIC code.
+        Returns:
+            Line: The parsed line.
+        """
+        line_obj = parse_line(line, self.environment)
+        line_number = line_obj.linenum
+
+        if self.optimize:
+            optimizer.optimize_program({line_number: line_obj})
+
+        if line_number in self.program:
+            replaced = self.program[line_number]
+            self.program[line_number] = line_obj
+            linked = isinstance(replaced.statement, classes.LinkedStatement) or isinstance(line_obj.statement, classes.LinkedStatement)
+            if linked or self.optimize:
+                # Link targets and inlined subroutines are stored on other lines, so the program is linked afresh
+                self._linked = False
+                self._code = None
+                self._changed.clear()
+            elif self._code is not None:
+                self._changed.add(line_number)
+            return line_obj
+
+        self.program[line_number] = line_obj
+
+        line_numbers = self._line_numbers
+        position = bisect.bisect_left(line_numbers, line_number)
+        line_numbers.insert(position, line_number)
+        self._reindex(position)
+        return line_obj
+
+    def delete_line(self, line_number):
+        """
+        Remove a line from the program.
+        Args:
+            line_number (int): The number of the line to remove.
+        Returns:
+            bool: True if the line existed.
+        """
+        if self.program.pop(line_number, None) is None:
+            return False
+
+        line_numbers = self._line_numbers
+        position = bisect.bisect_left(line_numbers, line_number)
+        del line_numbers[position]
+        del self._line_index[line_number]
+        self._changed.discard(line_number)
+        self._reindex(position)
+        return True
+
+    @property
+    def line_numbers(self):
+        """
+        The line numbers of the program in execution order. Read-only.
+        """
+        return self._line_numbers
+
+    def clear(self):
+        """
+        Remove the program and reset the interpreter.
+        """
+        self._set_program({})
+        self.environment.set_symbols({})
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the registers, variables and step counter so the program runs from the start.
+        """
+        self.environment.reset()
+        self.steps = 0
+        if self.profiler is not None:
+            self.profiler.reset()
+
+    @property
+    def finished(self):
+        """
+        Whether the program has run past its last line.
+        """
+        return self.environment.program_counter >= len(self.program)
+
+    def run(self, max_steps=None, max_time=None):
+        """
+        Run the program from the start until it ends, running is cleared or a limit is exceeded.
+
+        Limits are checked every RUN_CHUNK lines, so a run may overshoot
+        max_time by the time those lines take.
+        Args:
+            max_steps (int): The maximum number of lines to execute, or None for no limit.
+            max_time (float): The maximum wall-clock time in seconds, or None for no limit.
+        Returns:
+            RunResult: How the run ended.
+        """
+        self.reset()
+        self._prepare()
+
+        if self.tracer is not None:
+            self.tracer.start(self.environment, self.program)
+
+        return self._run(max_steps, max_time)
+
+    def resume(self, max_steps=None, max_time=None):
+        """
+        Continue the run from the current program counter, as after a limit or restoring a checkpoint.
+        Args:
+            max_steps (int): The maximum number of lines to execute from here, or None for no limit.
+            max_time (float): The maximum wall-clock time in seconds from here, or None for no limit.
+        Returns:
+            RunResult: How the run ended, counting steps from the start of the program.
+        """
+        self._prepare()
+        return self._run(max_steps, max_time)
+
+    def checkpoint(self):
+        """
+        Get the state needed to resume the run later.
+        Returns:
+            dict: The registers and variables, the step counter and the number of INPUT values read.
+        """
+        return {
+            "environment": self.environment.snapshot(),
+            "steps": self.steps,
+            "input_position": self.environment.input.position,
+        }
+
+    def restore(self, state):
+        """
+        Restore a state from checkpoint, skipping the INPUT values it had already read.
+
+        The same program must be loaded, and the input source must start
+        from the beginning of the values the checkpointed run was given.
+        Args:
+            state (dict): The state returned by checkpoint.
+        """
+        self.environment.restore(state["environment"])
+        self.steps = state["steps"]
+        self.environment.input.skip(state["input_position"] - self.environment.input.position)
+
+    def _run(self, max_steps, max_time):
+        """
+        Step the program in chunks until it ends, running is cleared or a limit is exceeded.
+        """
+        start = time.perf_counter()
+        deadline = start + max_time if max_time is not None else None
+        last_step = self.steps + max_steps if max_steps is not None else None
+        status = classes.RunResult.FINISHED
+
+        self.environment.running = True
+        try:
+            while True:
+                if not self.environment.running:
+                    status = classes.RunResult.INTERRUPTED
+                    break
+
+                count = RUN_CHUNK
+                if last_step is not None:
+                    count = min(count, last_step - self.steps)
+                    if count <= 0:
+                        status = classes.RunResult.STEP_LIMIT
+                        break
+
+                if not self.step(count):
+                    break
+
+                if deadline is not None and time.perf_counter() > deadline:
+                    status = classes.RunResult.TIME_LIMIT
+                    break
+        finally:
+            self.environment.running = False
+            self.environment.output.flush()
+
+        return classes.RunResult(status, self.steps, self.line_reached(), time.perf_counter() - start)
+
+    def line_reached(self):
+        """
+        Get the number of the next line to execute.
+        Returns:
+            int: The line number, or None if the program has finished.
+        """
+        if self.finished:
+            return None
+        return self._line_numbers[self.environment.program_counter]
+
+    def step(self, count=1):
+        """
+        Execute up to count lines, continuing from the current program counter.
+        Args:
+            count (int): The maximum number of lines to execute.
+        Returns:
+            bool: True if the program has lines left to run.
+        """
+        self._prepare()
+
+        if self.profiler is not None:
+            executed = self._step_profiled(count)
+        elif self.tracer is not None:
+            executed = self._step_traced(count)
+        elif self.engine == "compiled":
+            executed = self._step_compiled(count)
+        else:
+            executed = self._step_tree(count)
+
+        self.steps += executed
+        if self.finished:
+            self.environment.output.flush()
+            return False
+        return True
+
+    def _set_program(self, program):
+        """
+        Install a freshly loaded program, optimizing it if enabled.
+        """
+        if self.optimize:
+            folded = optimizer.optimize_program(program)
+            if self.environment.verbose:
+                click.echo(f"Optimizer folded {folded} nodes")
+
+        self.program = program
+        self._line_numbers = sorted(program)
+        self._line_index = build_line_index(self._line_numbers)
+        self._linked = False
+        self._code = None
+        self._changed.clear()
+
+    def _reindex(self, position):
+        """
+        Update the jump table from position onwards after a line is inserted or removed there.
+
+        Compiled code holds resolved indices, so it is discarded as well.
+        """
+        line_numbers = self._line_numbers
+        line_index = self._line_index
+        for index in range(position, len(line_numbers)):
+            line_index[line_numbers[index]] = index
+        line_index[classes.END_OF_PROGRAM] = len(line_numbers)
+
+        self._linked = False
+        self._code = None
+        self._changed.clear()
+
+    def _prepare(self):
+        """
+        Link the loops of the program and, for the compiled engine, compile it,
+        recompiling only the lines replaced since the last run.
+        """
+        if not self.program:
+            raise classes.BasicRuntimeError("No program loaded.")
+
+        if not self._linked:
+            link_program(self.program, self._line_numbers)
+            if self.optimize:
+                inlined = optimizer.inline_subroutines(self.program, self._line_numbers, self._line_index)
+                if inlined and self.environment.verbose:
+                    click.echo(f"Optimizer inlined {inlined} GOSUB calls")
+            self._linked = True
+
+        if self.engine != "compiled":
+            return
+
+        if self._code is None:
+            self._code = compile_program(self.program, self.environment, self._line_numbers, self._line_index)
+            self._changed.clear()
+        elif self._changed:
+            for line_number in self._changed:
+                index = self._line_index[line_number]
+                self._code[index] = self.program[line_number].compile(self.environment, self._line_index, index)
+            self._changed.clear()
+
+    def _step_tree(self, count):
+        """
+        Execute up to count lines by walking the parsed program.
+        Returns:
+            int: The number of lines executed.
+        """
+        environment = self.environment
+        program = self.program
+        line_numbers = self._line_numbers
+        line_index = self._line_index
+        line_count = len(line_numbers)
+
+        no_jump = classes.NO_JUMP
+
+        program_counter = environment.program_counter
+        executed = count
+        environment.jump = no_jump
+
+        try:
+            for step in range(count):
+                if program_counter >= line_count:
+                    executed = step
+                    break
+
+                line_number = line_numbers[program_counter]
+                environment.current_line = line_number
+
+                # Execute the line
+                program[line_number].execute(environment)
+
+                target = environment.jump
+                if target is no_jump:
+                    program_counter += 1
+                else:
+                    # A statement jumped, possibly back to this same line
+                    environment.jump = no_jump
+                    try:
+                        program_counter = line_index[target]
+                    except KeyError:
+                        raise classes.BasicRuntimeError(f"Undefined line number: {target}") from None
+        finally:
+            environment.program_counter = program_counter
+
+        return executed
+
+    def _step_traced(self, count):
+        """
+        Execute up to count lines one at a time, reporting each event to the tracer.
+        Returns:
+            int: The number of lines executed.
+        """
+        environment = self.environment
+        program = self.program
+        line_numbers = self._line_numbers
+        line_count = len(line_numbers)
+        tracer = self.tracer
+        step_one = self._step_compiled if self.engine == "compiled" else self._step_tree
+
+        executed = count
+
+        for step in range(count):
+            program_counter = environment.program_counter
+            if program_counter >= line_count:
+                executed = step
+                break
+
+            line_number = line_numbers[program_counter]
+            line = program[line_number]
+            statement = line.statement
+
+            tracer.line_enter(environment, line)
+
+            if type(statement) is classes.LetElementStatement or (type(statement) is classes.GosubStatement and statement.inline is not None):
+                # Element indexes and inlined statements are only known while the line runs, so it reports them itself
+                environment.current_line = line_number
+                statement.trace(environment, tracer)
+                environment.program_counter = program_counter + 1
+                tracer.statement_exec(environment, statement)
+            else:
+                step_one(1)
+                tracer.statement_exec(environment, statement)
+                for identifier in statement.assignments():
+                    tracer.assignment(environment, identifier.name, environment.variables[identifier.slot])
+
+            if environment.program_counter != program_counter + 1:
+                tracer.jump(environment, line_number, self.line_reached())
+
+        return executed
+
+    def _step_profiled(self, count):
+        """
+        Execute up to count lines one at a time, recording the hits and time of each line.
+
+        Lines are run through the tracer as well when one is set.
+        Returns:
+            int: The number of lines executed.
+        """
+        environment = self.environment
+        line_numbers = self._line_numbers
+        line_count = len(line_numbers)
+        hits = self.profiler.hits
+        times = self.profiler.times
+        if self.tracer is not None:
+            step_one = self._step_traced
+        else:
+            step_one = self._step_compiled if self.engine == "compiled" else self._step_tree
+        clock = time.perf_counter_ns
+
+        executed = count
+
+        for step in range(count):
+            if environment.program_counter >= line_count:
+                executed = step
+                break
+
+            line_number = line_numbers[environment.program_counter]
+            start = clock()
+            step_one(1)
+            times[line_number] += clock() - start
+            hits[line_number] += 1
+
+        return executed
+
+    def _step_compiled(self, count):
+        """
+        Execute up to count lines of the compiled program.
+        Returns:
+            int: The number of lines executed.
+        """
+        environment = self.environment
+        code = self._code
+        line_count = len(code)
+
+        program_counter = environment.program_counter
+        executed = count
+
+        try:
+            for step in range(count):
+                if program_counter >= line_count:
+                    executed = step
+                    break
+                program_counter = code[program_counter](environment)
+        finally:
+            environment.program_counter = program_counter
+
+        return executed
+
+def load_file(file, environment, use_cache=True):
+    """
+    Load a BASIC file, from its parsed program cache when it is up to date.
+
+    The cache is bypassed in verbose mode, which traces parsing.
+    Args:
+        file (str): The path to the BASIC file.
+        environment (Environment): The environment to resolve variables against.
+        use_cache (bool): If True, read and write the cache.
+    Returns:
+        dict: Mapping of line numbers to Line objects.
+    """
 
     # Open the file and read its contents
     with open(file, 'r') as f:
         code = f.read()
 
+    use_cache = use_cache and not environment.verbose
 
-    # PARSING STEP
+    if use_cache:
+        cached = cache.load(file, code)
+        if cached is not None:
+            program, symbols = cached
+            environment.set_symbols(symbols)
+            return program
+
+    program = load_program(code, environment)
+
+    if use_cache:
+        cache.save(file, code, program, environment.symbols)
+
+    return program
+
+def load_program(code, environment):
+    """
+    Parse BASIC source code into a program.
+    Args:
+        code (str): The BASIC source code.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        dict: Mapping of line numbers to Line objects.
+    """
+    program = {}
 
     # Split the code into lines
     lines = code.split('\n')
@@ -43,71 +626,118 @@ def run(file, verbose=False):
         if len(line) == 0:
             continue
         # Parse the line into a Line object
-        line_obj = parse_line(line)
+        line_obj = parse_line(line, environment)
 
-        if verbose:
+        if environment.verbose:
             click.echo(f"Parsed: {line} -> {line_obj}")
 
         program[line_obj.linenum] = line_obj
 
-    # EXECUTION STEP
-    # Set program counter
-    program_line_numbers = list(program.keys())
-    environment['__program_counter'] = 0
-    environment['__max_line_number'] = max(program_line_numbers)
-    environment['__current_line'] = -1
-
-    if environment['__verbose']:
-        click.echo(program)
-        click.echo(json.dumps(environment, indent=4))
-
-    # Execute the program
-    while environment['__program_counter'] < environment['__max_line_number']:
-
-        # Startup
-        if environment['__current_line'] == -1:
-            try:
-                environment['__current_line'] = program_line_numbers[environment['__program_counter']]
-            except IndexError:
-                click.echo("No program loaded.")
-                exit(1)
-        else:
-            line_index = program_line_numbers.index(environment['__current_line'])
-            if line_index != environment['__program_counter']:
-                # Means a GOTO has occured
-                environment['__program_counter'] = line_index
-            else:
-                environment['__program_counter'] += 1
+    return program
 
-        if environment['__program_counter'] >= len(program_line_numbers):
-            break
+def build_line_index(line_numbers):
+    """
+    Build the jump table for a program.
+    Args:
+        line_numbers (list): The line numbers of the program, in execution order.
+    Returns:
+        dict: A mapping of each line number to its position in line_numbers, and of END_OF_PROGRAM past the end.
+    """
+    line_index = {line_number: index for index, line_number in enumerate(line_numbers)}
+    line_index[classes.END_OF_PROGRAM] = len(line_numbers)
+    return line_index
+
+def link_program(program, line_numbers):
+    """
+    Store the lines each linked statement jumps to: GOSUB the line it returns to,
+    and the statements of FOR/NEXT and WHILE/WEND loops the lines around their pair.
+
+    Loops are matched by their nesting in line order, so jump targets are
+    fixed when the program is loaded rather than searched for at run time.
+    Args:
+        program (dict): Mapping of line numbers to Line objects.
+        line_numbers (list): The sorted line numbers of the program.
+    Raises:
+        BasicSyntaxError: If a loop is not closed, or closed by the wrong statement.
+    """
+    # Open loops, innermost last, as (index, statement) pairs
+    open_loops = []
 
-        environment['__current_line'] = program_line_numbers[environment['__program_counter']]
+    for index, line_number in enumerate(line_numbers):
+        statement = program[line_number].statement
+        if not isinstance(statement, classes.LinkedStatement):
+            continue
+
+        following = line_numbers[index + 1] if index + 1 < len(line_numbers) else classes.END_OF_PROGRAM
+
+        if isinstance(statement, classes.GosubStatement):
+            statement.return_line = following
+            statement.inline = None
+            continue
+
+        if isinstance(statement, (classes.ForStatement, classes.WhileStatement)):
+            open_loops.append((index, statement))
+            continue
+        opening = classes.ForStatement if isinstance(statement, classes.NextStatement) else classes.WhileStatement
+        keyword = "NEXT" if opening is classes.ForStatement else "WEND"
 
-        if environment['__verbose']:
-            click.echo(f"Executing line {environment['__current_line']}")
+        if not open_loops or not isinstance(open_loops[-1][1], opening):
+            raise classes.BasicSyntaxError(f"Syntax error: {keyword} without {'FOR' if keyword == 'NEXT' else 'WHILE'}; line {line_number}")
+        loop_index, loop = open_loops.pop()
 
-        line = program[environment['__current_line']]
-        if environment['__verbose']:
-            click.echo(f"Line: {line}")
+        if keyword == "NEXT" and statement.name is not None and statement.name != loop.identifier.name:
+            raise classes.BasicSyntaxError(f"Syntax error: NEXT {statement.name} closes FOR {loop.identifier.name}; line {line_number}")
 
-        # Execute the line
-        line.execute(environment)
-                   
-def parse_line(line):
+        body_line = line_numbers[loop_index + 1]
+
+        loop.exit_line = following
+        statement.loop = loop
+        statement.body_line = body_line
+
+    if open_loops:
+        loop_index, loop = open_loops[-1]
+        line_number = line_numbers[loop_index]
+        keyword = "FOR" if isinstance(loop, classes.ForStatement) else "WHILE"
+        raise classes.BasicSyntaxError(f"Syntax error: {keyword} without {'NEXT' if keyword == 'FOR' else 'WEND'}; line {line_number}")
+
+def compile_program(program, environment, line_numbers=None, line_index=None):
+    """
+    Compile a program into a list of functions, one per line.
+
+    Each function takes the environment, executes its line and returns the
+    index of the next line to execute, with jump targets resolved up front.
+    Args:
+        program (dict): Mapping of line numbers to Line objects.
+        environment (Environment): The environment the program will run in.
+        line_numbers (list): The sorted line numbers, if already known.
+        line_index (dict): The jump table of line_numbers, if already built.
+    Returns:
+        list: The compiled program.
+    """
+    if line_numbers is None:
+        line_numbers = sorted(program)
+    if line_index is None:
+        line_index = build_line_index(line_numbers)
+
+    return [
+        program[line_number].compile(environment, line_index, index)
+        for index, line_number in enumerate(line_numbers)
+    ]
+
+def parse_line(line, environment):
     """
     Parse a line of BASIC code.
     Args:
         line (str): A line of BASIC code.
+        environment (Environment): The environment to resolve variables against.
     Returns:
         Line: A Line object representing the parsed line.
     """
-    global parse_line_number
 
     line_parts = line.split(" ", 1) # Separate line number and actual code
     if len(line_parts) == 1: # No line number (so sequential line number instead)
-        line_number = parse_line_number
-        parse_line_number += 1
+        line_number = environment.parse_line_number
+        environment.parse_line_number += 1
         code = line_parts[0]
     else:
         line_number = int(line_parts[0])
@@ -115,7 +745,18 @@ def parse_line(line):
 
     # Tokenize the code
     tokens = tokenize(code)
-    return classes.Line(line_number, parse_tokens(tokens))
+    return classes.Line(line_number, parse_tokens(tokens, environment))
+
+# Alternatives are tried in order, so longer operators come first
+TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<string>"[^"]*")
+  | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<operator><=|>=|!=|==|[-+*/=<>])
+  | (?P<punctuation>[(),])
+  | (?P<error>.)
+""", re.VERBOSE)
 
 def tokenize(line):
     """
@@ -123,287 +764,623 @@ def tokenize(line):
     Args:
         line (str): A line of BASIC code.
     Returns:
-        list: A list of tokens.
+        list: A list of Token objects.
     """
     tokens = []
-    token = ""
-    in_string = False
-    in_comment = False
-
-    for char in line:
-        if char == '"':
-            in_string = not in_string
-            token += char
-        elif char.isspace() and not in_string:
-            if token:
-                tokens.append(token.strip())
-                token = ""
-        else:
-            token += char
 
-    if token:
-        tokens.append(token.strip())
+    for match in TOKEN_PATTERN.finditer(line):
+        kind = match.lastgroup
+        text = match.group()
+        column = match.start()
+
+        if kind == "space":
+            continue
+        if kind == "error":
+            syntax_error(f"Unexpected character {text!r} at column {column}", line)
+
+        if kind == classes.TOKEN_IDENTIFIER and text.upper() in classes.KEYWORDS:
+            tokens.append(classes.Token(classes.TOKEN_KEYWORD, text.upper(), column))
+
+            # Everything after REM is a comment
+            if text.upper() == "REM":
+                comment = line[match.end():].strip()
+                if comment:
+                    tokens.append(classes.Token(classes.TOKEN_COMMENT, comment, line.index(comment, match.end())))
+                break
+            continue
+
+        tokens.append(classes.Token(kind, text, column))
 
     return tokens
 
-def parse_tokens(tokens):
+def syntax_error(message, line):
     """
-    Parse a list of tokens into a BASIC expression.
+    Raise a syntax error.
+    Args:
+        message (str): Description of the error.
+        line (str): The code the error occured in.
+    """
+    raise classes.BasicSyntaxError(f"Syntax error: {message}; {line}")
+
+def expect_end(tokens, line):
+    """
+    Report a syntax error if a statement is followed by more tokens.
+    """
+    if not tokens.at_end():
+        token = tokens.peek()
+        if token.text == ")":
+            syntax_error("Mismatched parentheses", line)
+        syntax_error(f"Unexpected token {token.text!r} at column {token.column}", line)
+
+def parse_tokens(tokens, environment):
+    """
+    Parse a list of tokens into a BASIC statement.
     Args:
         tokens (list): A list of tokens.
+        environment (Environment): The environment to resolve variables against.
     Returns:
-        Expression: The parsed expression.
+        Statement: The parsed statement.
     """
 
     if len(tokens) == 0:
         return None
 
-    keyword = tokens.pop(0).upper()
+    tokens = classes.TokenStream(tokens)
+    keyword = tokens.next().text.upper()
 
     # Assignments
     if keyword == "LET": # LET <variable> = <expression>
-        return parse_let_stmt(tokens)
+        return parse_let_stmt(tokens, environment)
+    elif keyword == "DIM": # DIM <array>(<expression>) [, ...]
+        return parse_dim_stmt(tokens, environment)
     
     # IO statements
     elif keyword == "PRINT": # PRINT <expression>
-        return parse_print_stmt(tokens)
+        return parse_print_stmt(tokens, environment)
     elif keyword == "INPUT": # INPUT <identifier> <string>
-        return parse_input_stmt(tokens)
+        return parse_input_stmt(tokens, environment)
 
     # Control flow statements
     elif keyword == "GOTO": # GOTO <value:int>
-        return parse_goto_stmt(tokens)
+        return parse_goto_stmt(tokens, environment)
     elif keyword == "IF": # IF <expression> THEN <statement>
-        return parse_if_stmt(tokens)
+        return parse_if_stmt(tokens, environment)
     elif keyword == "ELSE": # ELSE <statement>
-        return parse_else_stmt(tokens)
+        return parse_else_stmt(tokens, environment)
     elif keyword == "END": # END
-        return parse_end_stmt(tokens)
+        return parse_end_stmt(tokens, environment)
+    elif keyword == "FOR": # FOR <identifier> = <expression> TO <expression> [STEP <expression>]
+        return parse_for_stmt(tokens, environment)
+    elif keyword == "NEXT": # NEXT [<identifier>]
+        return parse_next_stmt(tokens, environment)
+    elif keyword == "WHILE": # WHILE <expression>
+        return parse_while_stmt(tokens, environment)
+    elif keyword == "WEND": # WEND
+        return parse_wend_stmt(tokens, environment)
+    elif keyword == "GOSUB": # GOSUB <value:int>
+        return parse_gosub_stmt(tokens, environment)
+    elif keyword == "RETURN": # RETURN
+        return parse_return_stmt(tokens, environment)
 
     # Comments
     elif keyword == "REM": # REM <...>
         # Ignore comments
-        line = ' '.join(tokens)
-        return classes.RemStatement(line)
+        return classes.RemStatement(tokens.rest())
 
     else:
-        if environment['__internal_test_mode']:
-            raise ValueError(f"Unknown keyword: {keyword}; {' '.join(tokens)}")
-        click.echo(f"Unknown keyword: {keyword}; {' '.join(tokens)}", err=True)
-        exit(1)
+        syntax_error(f"Unknown keyword {keyword}", tokens.rest())
+
+# Binding power of binary operators; higher binds tighter
+PRECEDENCE = {
+    '==': 1, '!=': 1, '<': 1, '>': 1, '<=': 1, '>=': 1,
+    '+': 2, '-': 2,
+    '*': 3, '/': 3,
+}
 
-def parse_expression(tokens):
+def parse_expression(tokens, environment, min_precedence=1):
     """
-    Parse a list of tokens into a BASIC expression.
+    Parse tokens into a BASIC expression, stopping at the first token that cannot continue it.
+
+    Binary operators are parsed by precedence climbing and associate to the left.
+    A run of several operators of one precedence becomes a single Chain, so
+    expression depth does not grow with the number of terms.
     Args:
-        tokens (list): A list of tokens.
+        tokens (TokenStream): The tokens to parse.
+        environment (Environment): The environment to resolve variables against.
+        min_precedence (int): The lowest operator precedence this call may consume.
     Returns:
         Expression: The parsed expression.
     """
     
-    # EXPRESSION: VALUE [ OPERATOR EXPRESSION ] | '(' EXPRESSION ')'
+    # EXPRESSION: OPERAND { OPERATOR OPERAND }
 
-    line = ' '.join(tokens)
-    if len(tokens) == 0:
+    if tokens.at_end():
         return None
 
-    # Case: VALUE [ OPERATOR EXPRESSION ]
-    if len(tokens) >= 1:
-        token = tokens.pop(0)
-        if token.isdigit():
-            left = classes.Value(int(token))
-        else:
-            # Handle string literals
-            if token.startswith('"'):
-                while not token.endswith('"'):
-                    token += tokens.pop(0)
-                left = classes.Value(token[1:-1])
-            else:
-                # Handle identifiers
-                left = classes.Identifier(token)
-
-        if len(tokens) > 1:
-            operator = tokens.pop(0)
-            right = parse_expression(tokens)
-            operation = classes.Operation(operator, left, right)
-            return operation
-        else:
-            return left
-
-    # Case: '(' EXPRESSION ')'
-    if tokens[0] == "(":
-        # Handle parentheses
-        tokens.pop(0)
-        expr = parse_expression(tokens[:-1])
-        if tokens and tokens[0] == ")":
-            tokens.pop(0)
-            return expr
+    # Error messages quote the expression from its first token, joined only when one is raised
+    start = tokens.position
+    operands = [parse_operand(tokens, environment, start)]
+    operators = []
+    run_precedence = None
+
+    while True:
+        token = tokens.peek()
+        if token is None or token.kind != classes.TOKEN_OPERATOR:
+            break
+
+        operator = token.text
+        if operator not in PRECEDENCE:
+            syntax_error(f"Invalid operator {operator}", tokens.text_from(start))
+
+        precedence = PRECEDENCE[operator]
+        if precedence < min_precedence:
+            break
+
+        tokens.next()
+        right = parse_expression(tokens, environment, precedence + 1)
+        if right is None:
+            syntax_error(f"Missing operand after {operator}", tokens.text_from(start))
+
+        # A lower precedence operator takes the run so far as its left operand
+        if precedence != run_precedence and operators:
+            operands = [build_operation(operators, operands, environment)]
+            operators = []
+        run_precedence = precedence
+        operators.append(operator)
+        operands.append(right)
+
+    return build_operation(operators, operands, environment)
+
+def build_operation(operators, operands, environment):
+    """
+    Build the node for a run of operators of one precedence.
+    Args:
+        operators (list): The operators, in order.
+        operands (list): The operands, one more than the operators.
+        environment (Environment): The environment, whose verbose flag selects the traced node classes.
+    Returns:
+        Expression: The single operand, an Operation for one operator, or a Chain for several.
+    """
+    if not operators:
+        return operands[0]
+
+    # Operations only echo their results when built in verbose mode
+    if len(operators) == 1:
+        operation = classes.TracedOperation if environment.verbose else classes.Operation
+        return operation(operators[0], operands[0], operands[1])
+
+    chain = classes.TracedChain if environment.verbose else classes.Chain
+    return chain(operators, operands)
+
+def parse_operand(tokens, environment, start):
+    """
+    Parse a single operand: a value, a parenthesized expression or a negated operand.
+    Args:
+        tokens (TokenStream): The tokens to parse.
+        environment (Environment): The environment to resolve variables against.
+        start (int): The position of the first token of the expression, for error messages.
+    Returns:
+        Expression: The parsed operand.
+    """
+
+    # OPERAND: VALUE | '(' EXPRESSION ')' | '-' OPERAND
+
+    token = tokens.next()
+    if token is None:
+        syntax_error("Missing operand", tokens.text_from(start))
+
+    if token.kind == classes.TOKEN_NUMBER:
+        return classes.Value(float(token.text) if '.' in token.text else int(token.text))
+    if token.kind == classes.TOKEN_STRING:
+        return classes.Value(token.text[1:-1])
+    if token.kind == classes.TOKEN_IDENTIFIER:
+        following = tokens.peek()
+        if following is None or following.text != "(":
+            return classes.Identifier(token.text, environment.slot(token.text))
+
+        tokens.next()
+        name = token.text.upper()
+        if name in classes.ARRAY_FUNCTIONS:
+            argument = tokens.next()
+            if argument is None or argument.kind != classes.TOKEN_IDENTIFIER:
+                syntax_error(f"{name} takes the name of an array", tokens.text_from(start))
+            operand = classes.ArrayFunction(name, array_identifier(argument.text, environment))
         else:
-            if environment['__internal_test_mode']:
-                raise ValueError("Mismatched parentheses")
-            click.echo("Syntax error: Mismatched parentheses; {line}", err=True)
-            exit(1)
+            operand = parse_element(token.text, tokens, environment, start)
+
+        closing = tokens.next()
+        if closing is None or closing.text != ")":
+            syntax_error("Mismatched parentheses", tokens.text_from(start))
+        return operand
+
+    if token.text == "(":
+        following = tokens.peek()
+        if following is not None and following.text == ")":
+            syntax_error("Empty parentheses", tokens.text_from(start))
+        expression = parse_expression(tokens, environment)
+        if expression is None:
+            syntax_error("Mismatched parentheses", tokens.text_from(start))
+        closing = tokens.next()
+        if closing is None or closing.text != ")":
+            syntax_error("Mismatched parentheses", tokens.text_from(start))
+        return expression
+
+    if token.text == "-":
+        operand = parse_operand(tokens, environment, start)
+        if type(operand) is classes.Value and isinstance(operand.value, (int, float)):
+            return classes.Value(-operand.value)
+        if environment.verbose:
+            return classes.TracedOperation('-', classes.Value(0), operand)
+        return classes.Operation('-', classes.Value(0), operand)
+
+    syntax_error(f"Unexpected token {token.text!r} at column {token.column}", tokens.text_from(start))
+
+def array_identifier(name, environment):
+    """
+    Get the identifier of an array. Arrays have their own slots, so A and A(1) are different variables.
+    Args:
+        name (str): The name of the array.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        Identifier: The identifier of the array.
+    """
+    return classes.Identifier(name, environment.slot(f"{name}()"))
 
+def parse_element(name, tokens, environment, start):
+    """
+    Parse the index of an array element, after its opening parenthesis.
+    Args:
+        name (str): The name of the array.
+        tokens (TokenStream): The tokens to parse.
+        environment (Environment): The environment to resolve variables against.
+        start (int): The position of the first token of the statement or expression, for error messages.
+    Returns:
+        Element: The parsed element.
+    """
+    index = parse_expression(tokens, environment)
+    if index is None:
+        syntax_error(f"Missing index of array {name}", tokens.text_from(start))
+    return classes.Element(name, array_identifier(name, environment).slot, index)
+
+def parse_line_number_token(tokens, line, statement):
+    """
+    Parse a jump target line number.
+    Args:
+        tokens (TokenStream): The tokens to parse.
+        line (str): The statement code, for error messages.
+        statement (str): The statement name, for error messages.
+    Returns:
+        int: The line number.
+    """
+    token = tokens.next()
+    if token is None:
+        syntax_error(f"Missing {statement} value", line)
+    if token.kind != classes.TOKEN_NUMBER or not token.text.isdigit():
+        syntax_error(f"Invalid {statement} value {token.text!r}", line)
+    return int(token.text)
 
 # LET <variable> = <expression>
-def parse_let_stmt(tokens):
+def parse_let_stmt(tokens, environment):
     """
     Parse a LET statement.
     Args:
-        tokens (list): A list of tokens.
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
     Returns:
         LetStatement: The parsed LET statement.
     """
 
-    line = ' '.join(tokens)
-    if len(tokens) < 3 or tokens[1] != "=":
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid LET statement")
-        click.echo("Syntax error: Invalid LET statement; {line}", err=True)
-        exit(1)
+    start = tokens.position
+    line = tokens.rest()
+    name = tokens.next()
+    if name is None or name.kind != classes.TOKEN_IDENTIFIER:
+        syntax_error("Invalid LET statement", line)
+
+    element = None
+    following = tokens.peek()
+    if following is not None and following.text == "(":
+        tokens.next()
+        element = parse_element(name.text, tokens, environment, start)
+        closing = tokens.next()
+        if closing is None or closing.text != ")":
+            syntax_error("Mismatched parentheses", line)
+
+    equals = tokens.next()
+    if equals is None or equals.text != "=" or tokens.at_end():
+        syntax_error("Invalid LET statement", line)
+
+    expression = parse_expression(tokens, environment)
+    expect_end(tokens, line)
 
-    identifier = classes.Identifier(tokens[0])
-    expression = parse_expression(tokens[2:])
+    if element is not None:
+        return classes.LetElementStatement(line, element, expression)
 
+    identifier = classes.Identifier(name.text, environment.slot(name.text))
     return classes.LetStatement(line, identifier, expression)
 
+# DIM <array>(<expression>) [, <array>(<expression>) ...]
+def parse_dim_stmt(tokens, environment):
+    """
+    Parse a DIM statement.
+    Args:
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        DimStatement: The parsed DIM statement.
+    """
+
+    line = tokens.rest()
+    arrays = []
+
+    while True:
+        name = tokens.next()
+        opening = tokens.next()
+        if name is None or name.kind != classes.TOKEN_IDENTIFIER or opening is None or opening.text != "(":
+            syntax_error("Invalid DIM statement", line)
+
+        size = parse_expression(tokens, environment)
+        closing = tokens.next()
+        if size is None or closing is None or closing.text != ")":
+            syntax_error("Invalid DIM statement", line)
+        arrays.append((array_identifier(name.text, environment), size))
+
+        separator = tokens.next()
+        if separator is None:
+            break
+        if separator.text != ",":
+            syntax_error(f"Unexpected token {separator.text!r} at column {separator.column}", line)
+
+    return classes.DimStatement(line, arrays)
+
 # PRINT <expression>
-def parse_print_stmt(tokens):
+def parse_print_stmt(tokens, environment):
     """
     Parse a PRINT statement.
     Args:
-        tokens (list): A list of tokens.
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
     Returns:
         PrintStatement: The parsed PRINT statement.
     """
 
-    line = ' '.join(tokens)
-    if len(tokens) == 0:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid PRINT statement")
-        click.echo("Syntax error: Invalid PRINT statement; {line}", err=True)
-        exit(1)
-
-    expression = parse_expression(tokens)
+    line = tokens.rest()
+    expression = parse_expression(tokens, environment)
 
     if expression is None:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid PRINT statement")
-        click.echo("Syntax error: Invalid PRINT statement; {line}", err=True)
-        exit(1)
+        syntax_error("Invalid PRINT statement", line)
+    expect_end(tokens, line)
 
     return classes.PrintStatement(line, expression)
 
 # INPUT <identifier> <string>
-def parse_input_stmt(tokens):
+def parse_input_stmt(tokens, environment):
     """
     Parse an INPUT statement.
     Args:
-        tokens (list): A list of tokens.
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
     Returns:
         InputStatement: The parsed INPUT statement.
     """
 
-    line = ' '.join(tokens)
+    line = tokens.rest()
 
-    if len(tokens) == 0:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid INPUT statement")
-        click.echo("Syntax error: Invalid INPUT statement; {line}", err=True)
-        exit(1)
+    name = tokens.next()
+    if name is None or name.kind != classes.TOKEN_IDENTIFIER:
+        syntax_error("Invalid INPUT statement", line)
     
-    identifier = classes.Identifier(tokens[0])
-    prompt = tokens[1] if len(tokens) > 1 else None
+    identifier = classes.Identifier(name.text, environment.slot(name.text))
+    prompt = tokens.next()
+    if prompt is not None and prompt.kind != classes.TOKEN_STRING:
+        syntax_error("INPUT prompt must be a string", line)
+    expect_end(tokens, line)
 
-    return classes.InputStatement(line, identifier, prompt)
+    return classes.InputStatement(line, identifier, prompt.text if prompt else None)
 
 # GOTO <value>
-def parse_goto_stmt(tokens):
+def parse_goto_stmt(tokens, environment):
     """
     Parse a GOTO statement.
     Args:
-        tokens (list): A list of tokens.
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
     Returns:
         GotoStatement: The parsed GOTO statement.
     """
-    line = ' '.join(tokens)
-    if len(tokens) == 0:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid GOTO statement")
-        click.echo("Syntax error: Invalid GOTO statement; {line}", err=True)
-        exit(1)
-    
-    line_number = int(tokens[0])
+    line = tokens.rest()
+    line_number = parse_line_number_token(tokens, line, "GOTO")
+    expect_end(tokens, line)
+
     return classes.GotoStatement(line, line_number)
 
 # IF <expression> GOTO <value>
-def parse_if_stmt(tokens):
+def parse_if_stmt(tokens, environment):
     """
     Parse an IF statement.
     Args:
-        tokens (list): A list of tokens.
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
     Returns:
         IfStatement: The parsed IF statement.
     """
 
-    line = ' '.join(tokens)
-    if len(tokens) < 3:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid IF statement")
-        click.echo("Syntax error: Invalid IF statement; {line}", err=True)
-        exit(1)
+    line = tokens.rest()
+    expression = parse_expression(tokens, environment)
+    if expression is None:
+        syntax_error("Invalid IF expression", line)
 
-    goto_index = tokens.index("GOTO")
-    if goto_index == -1:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid IF statement")
-        click.echo("Syntax error: Missing GOTO statement; {line}", err=True)
-        exit(1)
+    keyword = tokens.next()
+    if keyword is None or keyword.text != "GOTO":
+        syntax_error("Missing GOTO statement", line)
 
-    expression = parse_expression(tokens[:goto_index])
-    if expression is None:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid IF statement")
-        click.echo("Syntax error: Invalid IF expression; {line}", err=True)
-        exit(1)
+    line_number = parse_line_number_token(tokens, line, "GOTO")
+    expect_end(tokens, line)
 
-    if len(tokens) < goto_index + 2:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid IF statement")
-        click.echo("Syntax error: Missing GOTO value; {line}", err=True)
-        exit(1)
-    line_number = int(tokens[goto_index + 1])
     return classes.IfStatement(line, expression, line_number)
 
+# END
+def parse_end_stmt(tokens, environment):
+    """
+    Parse an END statement.
+    Args:
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        EndStatement: The parsed END statement.
+    """
+
+    line = tokens.rest()
+    expect_end(tokens, line)
+
+    return classes.EndStatement(line)
+
 # ELSE GOTO <value>
-def parse_else_stmt(tokens):
+def parse_else_stmt(tokens, environment):
     """
     Parse an ELSE statement.
     Args:
-        tokens (list): A list of tokens.
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
     Returns:
         ElseStatement: The parsed ELSE statement.
     """
 
-    line = ' '.join(tokens)
-    if len(tokens) == 0:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid ELSE statement")
-        click.echo("Syntax error: Invalid ELSE statement; {line}", err=True)
-        exit(1)
-
-    if tokens[0] != "GOTO":
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid ELSE statement")
-        click.echo("Syntax error: Missing GOTO statement; {line}", err=True)
-        exit(1)
+    line = tokens.rest()
+    keyword = tokens.next()
+    if keyword is None or keyword.text != "GOTO":
+        syntax_error("Missing GOTO statement", line)
 
-    if len(tokens) < 2:
-        if environment['__internal_test_mode']:
-            raise ValueError("Invalid ELSE statement")
-        click.echo("Syntax error: Missing GOTO value; {line}", err=True)
-        exit(1)
+    line_number = parse_line_number_token(tokens, line, "GOTO")
+    expect_end(tokens, line)
 
-    line_number = int(tokens[1])
     return classes.ElseStatement(line, line_number)
 
+# FOR <identifier> = <expression> TO <expression> [STEP <expression>]
+def parse_for_stmt(tokens, environment):
+    """
+    Parse a FOR statement.
+    Args:
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        ForStatement: The parsed FOR statement.
+    """
+
+    line = tokens.rest()
+    name = tokens.next()
+    equals = tokens.next()
+    if name is None or name.kind != classes.TOKEN_IDENTIFIER or equals is None or equals.text != "=":
+        syntax_error("Invalid FOR statement", line)
+
+    start = parse_expression(tokens, environment)
+    keyword = tokens.next()
+    if start is None or keyword is None or keyword.text != "TO":
+        syntax_error("Missing TO in FOR statement", line)
+
+    end = parse_expression(tokens, environment)
+    if end is None:
+        syntax_error("Missing FOR limit", line)
+
+    step = classes.Value(1)
+    keyword = tokens.next()
+    if keyword is not None:
+        if keyword.text != "STEP":
+            syntax_error(f"Unexpected token {keyword.text!r} at column {keyword.column}", line)
+        step = parse_expression(tokens, environment)
+        if step is None:
+            syntax_error("Missing FOR step", line)
+        expect_end(tokens, line)
+
+    # The limit and step live in hidden slots named after the counter, which no identifier can spell
+    identifier = classes.Identifier(name.text, environment.slot(name.text))
+    limit_slot = environment.slot(f"{name.text} TO")
+    step_slot = environment.slot(f"{name.text} STEP")
+
+    return classes.ForStatement(line, identifier, start, end, step, limit_slot, step_slot)
+
+# NEXT [<identifier>]
+def parse_next_stmt(tokens, environment):
+    """
+    Parse a NEXT statement.
+    Args:
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        NextStatement: The parsed NEXT statement.
+    """
+
+    line = tokens.rest()
+    name = tokens.next()
+    if name is not None and name.kind != classes.TOKEN_IDENTIFIER:
+        syntax_error("Invalid NEXT statement", line)
+    expect_end(tokens, line)
+
+    return classes.NextStatement(line, name.text if name else None)
+
+# WHILE <expression>
+def parse_while_stmt(tokens, environment):
+    """
+    Parse a WHILE statement.
+    Args:
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        WhileStatement: The parsed WHILE statement.
+    """
+
+    line = tokens.rest()
+    condition = parse_expression(tokens, environment)
+    if condition is None:
+        syntax_error("Invalid WHILE expression", line)
+    expect_end(tokens, line)
+
+    return classes.WhileStatement(line, condition)
+
+# WEND
+def parse_wend_stmt(tokens, environment):
+    """
+    Parse a WEND statement.
+    Args:
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        WendStatement: The parsed WEND statement.
+    """
+
+    line = tokens.rest()
+    expect_end(tokens, line)
+
+    return classes.WendStatement(line)
+
+# GOSUB <value>
+def parse_gosub_stmt(tokens, environment):
+    """
+    Parse a GOSUB statement.
+    Args:
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        GosubStatement: The parsed GOSUB statement.
+    """
+
+    line = tokens.rest()
+    line_number = parse_line_number_token(tokens, line, "GOSUB")
+    expect_end(tokens, line)
+
+    return classes.GosubStatement(line, line_number)
+
+# RETURN
+def parse_return_stmt(tokens, environment):
+    """
+    Parse a RETURN statement.
+    Args:
+        tokens (TokenStream): The tokens following the keyword.
+        environment (Environment): The environment to resolve variables against.
+    Returns:
+        ReturnStatement: The parsed RETURN statement.
+    """
+
+    line = tokens.rest()
+    expect_end(tokens, line)
+
+    return classes.ReturnStatement(line)
@@ -0,0 +1,104 @@
+"""
+interpreters/basic/batch.py
+Parallel batch runner for BASIC programs
+"""
+
+import functools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import interpreters.basic as basic
+
+def read_manifest(file):
+    """
+    Read a batch manifest.
+
+    The manifest is a JSONL file with one job per line. Each job is an object
+    with the program "file", an optional list of "inputs" answering its INPUT
+    statements in order, and an optional "id" copied to the job's result.
+    Relative program paths are resolved against the manifest's directory.
+    Args:
+        file (str): The path to the manifest.
+    Returns:
+        list: The jobs in the manifest.
+    """
+    directory = os.path.dirname(os.path.abspath(file))
+    jobs = []
+
+    with open(file, 'r') as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+
+            job = json.loads(line)
+            if "file" not in job:
+                raise ValueError(f"Manifest line {number} has no program file.")
+
+            job.setdefault("id", number)
+            job.setdefault("inputs", [])
+            job["file"] = os.path.join(directory, job["file"])
+            jobs.append(job)
+
+    return jobs
+
+def run_job(job, engine="tree", optimize=False, max_steps=None, max_time=None):
+    """
+    Run a single batch job, capturing its output.
+    Args:
+        job (dict): The job, as read by read_manifest. Its own "max_steps" and "max_time" override the defaults.
+        engine (str): The execution engine to use.
+        optimize (bool): If True, fold constant expressions before running.
+        max_steps (int): The default maximum number of lines to execute, or None for no limit.
+        max_time (float): The default maximum wall-clock time in seconds, or None for no limit.
+    Returns:
+        dict: The job id and file, its status ("ok", "error", "step_limit" or "time_limit"),
+            the steps executed, the line reached, its output and any error message.
+    """
+    output = basic.streams.MemorySink()
+    inputs = basic.streams.IteratorInput(job["inputs"])
+    result = {"id": job["id"], "file": job["file"], "status": "ok", "error": None}
+
+    interpreter = basic.BasicInterpreter(engine=engine, optimize=optimize, output=output, input=inputs)
+    try:
+        interpreter.load_file(job["file"])
+        run_result = interpreter.run(
+            max_steps=job.get("max_steps", max_steps),
+            max_time=job.get("max_time", max_time),
+        )
+        if run_result.limit_exceeded:
+            result["status"] = run_result.status
+            result["error"] = run_result.message()
+    except basic.classes.BasicError as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["steps"] = interpreter.steps
+    result["line"] = interpreter.line_reached() if interpreter.program else None
+    result["output"] = output.getvalue()
+    return result
+
+def run_batch(jobs, workers=None, engine="tree", optimize=False, max_steps=None, max_time=None):
+    """
+    Run batch jobs in parallel across worker processes.
+    Args:
+        jobs (list): The jobs to run, as read by read_manifest.
+        workers (int): The number of worker processes, or None for one per CPU.
+        engine (str): The execution engine to use.
+        optimize (bool): If True, fold constant expressions before running.
+        max_steps (int): The default maximum number of lines per job, or None for no limit.
+        max_time (float): The default maximum wall-clock time per job in seconds, or None for no limit.
+    Returns:
+        iterator: The result of each job, in the order of jobs.
+    """
+    workers = workers or os.cpu_count() or 1
+    job = functools.partial(run_job, engine=engine, optimize=optimize, max_steps=max_steps, max_time=max_time)
+
+    # Hand out jobs in chunks so short programs are not dominated by IPC
+    chunksize = max(1, len(jobs) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(job, jobs, chunksize=chunksize)
@@ -0,0 +1,124 @@
+"""
+interpreters/basic/cache.py
+Cache of parsed BASIC programs
+
+Parsed programs are pickled to __basiccache__/<name>.basc next to the
+source file, keyed by the cache format version, a fingerprint of the
+parser code and a hash of the source.
+"""
+
+import functools
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+
+# Version of the cache entry layout
+CACHE_VERSION = 2
+
+# Modules of this package that parse programs and define the classes they build.
+# Any edit to them changes the parser fingerprint, so stale parses are never reused.
+PARSER_MODULES = ("__init__.py", "classes.py")
+
+CACHE_DIRECTORY = "__basiccache__"
+CACHE_SUFFIX = ".basc"
+
+def cache_path(file):
+    """
+    Get the cache file path for a BASIC source file.
+    Args:
+        file (str): The path to the BASIC file.
+    Returns:
+        str: The path of its cache file.
+    """
+    directory, name = os.path.split(os.path.abspath(file))
+    stem = os.path.splitext(name)[0]
+    return os.path.join(directory, CACHE_DIRECTORY, stem + CACHE_SUFFIX)
+
+@functools.cache
+def parser_fingerprint():
+    """
+    Hash the code of the parser modules, computed once per process.
+    Returns:
+        str: The hex digest of the modules in PARSER_MODULES.
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in PARSER_MODULES:
+        with open(os.path.join(directory, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def source_hash(code):
+    """
+    Hash BASIC source code for cache validation.
+    """
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+def load(file, code):
+    """
+    Load the cached parse of a BASIC file, if it is valid for the given source.
+    Args:
+        file (str): The path to the BASIC file.
+        code (str): The current source code of the file.
+    Returns:
+        tuple: The cached program and variable symbol table, or None if there is no valid cache.
+    """
+    # A program unpickles into many small objects; skip the collector passes they would trigger
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        with open(cache_path(file), 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+        return None
+    finally:
+        if collecting:
+            gc.enable()
+
+    if not isinstance(entry, dict):
+        return None
+    if entry.get("version") != CACHE_VERSION or entry.get("parser") != parser_fingerprint():
+        return None
+    if entry.get("hash") != source_hash(code):
+        return None
+
+    return entry["program"], entry["symbols"]
+
+def save(file, code, program, symbols):
+    """
+    Write the parse of a BASIC file to its cache file.
+
+    Failures to write the cache are ignored, as with Python's bytecode cache.
+    Args:
+        file (str): The path to the BASIC file.
+        code (str): The source code the program was parsed from.
+        program (dict): Mapping of line numbers to Line objects.
+        symbols (dict): Mapping of variable names to slots.
+    """
+    path = cache_path(file)
+    entry = {
+        "version": CACHE_VERSION,
+        "parser": parser_fingerprint(),
+        "hash": source_hash(code),
+        "program": program,
+        "symbols": symbols,
+    }
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Write to a temporary file first so readers never see a partial cache
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=CACHE_SUFFIX)
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(data)
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    except (OSError, pickle.PicklingError, RecursionError):
+        pass
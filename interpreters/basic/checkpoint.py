@@ -0,0 +1,74 @@
+"""
+interpreters/basic/checkpoint.py
+Checkpoints of BASIC runs
+
+A checkpoint pickles the state of a stopped run, with a hash of the
+program source, so the run can be resumed later from the same file.
+"""
+
+import os
+import pickle
+import tempfile
+
+import interpreters.basic.cache as cache
+from interpreters.basic.errors import BasicRuntimeError
+
+# Bump whenever the layout of the saved state changes
+CHECKPOINT_VERSION = 1
+
+CHECKPOINT_SUFFIX = ".bchk"
+
+def save(path, file, state):
+    """
+    Write a checkpoint atomically.
+    Args:
+        path (str): The path of the checkpoint file.
+        file (str): The path to the BASIC file being run.
+        state (dict): The interpreter state, from BasicInterpreter.checkpoint.
+    """
+    with open(file, 'r') as f:
+        code = f.read()
+
+    entry = {
+        "version": CHECKPOINT_VERSION,
+        "hash": cache.source_hash(code),
+        "state": state,
+    }
+    data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Write to a temporary file first so a preempted save never leaves a partial checkpoint
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=CHECKPOINT_SUFFIX)
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(data)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+def load(path, file):
+    """
+    Read a checkpoint, checking it was taken from the current source of the file.
+    Args:
+        path (str): The path of the checkpoint file.
+        file (str): The path to the BASIC file being run.
+    Returns:
+        dict: The interpreter state, for BasicInterpreter.restore.
+    """
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError) as e:
+        raise BasicRuntimeError(f"Cannot read checkpoint {path}: {e}") from None
+
+    if not isinstance(entry, dict) or entry.get("version") != CHECKPOINT_VERSION:
+        raise BasicRuntimeError(f"Checkpoint {path} has an unsupported format.")
+
+    with open(file, 'r') as f:
+        code = f.read()
+    if entry.get("hash") != cache.source_hash(code):
+        raise BasicRuntimeError(f"Checkpoint {path} was taken from a different version of {file}.")
+
+    return entry["state"]
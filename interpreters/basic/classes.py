@@ -3,7 +3,325 @@ interpreters/basic/classes.py
 BASIC interpreter classes
 """
 
+import array
 import click
+import operator
+
+from interpreters.basic.errors import BasicError, BasicSyntaxError, BasicRuntimeError
+from interpreters.basic.streams import OutputSink, EchoSink, as_input
+
+# Operator symbols and the functions implementing them
+OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '==': operator.eq,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '!=': operator.ne,
+}
+
+# Token kinds
+TOKEN_NUMBER = "number"
+TOKEN_STRING = "string"
+TOKEN_IDENTIFIER = "identifier"
+TOKEN_OPERATOR = "operator"
+TOKEN_KEYWORD = "keyword"
+TOKEN_PUNCTUATION = "punctuation"
+TOKEN_COMMENT = "comment"
+
+KEYWORDS = {
+    "LET", "PRINT", "INPUT", "GOTO", "IF", "THEN", "ELSE", "WHILE", "DO", "END", "REM", "DIM",
+    "FOR", "TO", "STEP", "NEXT", "WEND", "GOSUB", "RETURN",
+}
+
+# Maximum nesting of GOSUB calls; the return stack is allocated at this size up front
+MAX_GOSUB_DEPTH = 1024
+
+# Built-in functions over a whole array, run by the C implementations of the builtins
+ARRAY_FUNCTIONS = {
+    "SUM": sum,
+    "MIN": min,
+    "MAX": max,
+}
+
+# Jump target that ends the program
+END_OF_PROGRAM = None
+
+# Value of Environment.jump while the current line has not jumped
+NO_JUMP = object()
+
+# Value of a variable slot that has not been assigned yet
+UNDEFINED = object()
+
+class Environment:
+    """
+    A class holding the registers and variables of a BASIC run.
+
+    Variables are resolved to integer slots when the program is parsed and
+    their values are kept in a list indexed by slot.
+
+    Attributes:
+        program_counter (int): The index of the line being executed.
+        current_line (int): The number of the line being executed.
+        jump (int): The line a statement jumps to, END_OF_PROGRAM to stop, or NO_JUMP to continue with the next line.
+        verbose (bool): If True, enable verbose output.
+        running (bool): Whether a program is running. Cleared to stop a run from the REPL.
+        output (OutputSink): The sink PRINT writes to.
+        input (InputSource): The source INPUT reads values from.
+        parse_line_number (int): The line number given to the next line parsed without one.
+        symbols (dict): Mapping of variable names to slots.
+        variables (list): Variable values, indexed by slot.
+        return_stack (list): The lines GOSUB calls return to, preallocated to MAX_GOSUB_DEPTH entries.
+        return_depth (int): The number of entries of return_stack in use.
+    """
+
+    __slots__ = (
+        "program_counter",
+        "current_line",
+        "jump",
+        "verbose",
+        "running",
+        "output",
+        "input",
+        "parse_line_number",
+        "symbols",
+        "variables",
+        "return_stack",
+        "return_depth",
+    )
+
+    def __init__(self, verbose=False, output=None, input=None):
+        self.program_counter = 0
+        self.current_line = -1
+        self.jump = NO_JUMP
+        self.verbose = verbose
+        self.running = False
+
+        # Plain streams are echoed to line by line
+        if not isinstance(output, OutputSink):
+            output = EchoSink(output)
+        self.output = output
+        self.input = as_input(input)
+        self.parse_line_number = 0
+        self.symbols = {}
+        self.variables = []
+        self.return_stack = [None] * MAX_GOSUB_DEPTH
+        self.return_depth = 0
+
+    def __repr__(self):
+        return f"Environment({self.snapshot()})"
+
+    def slot(self, name):
+        """
+        Get the slot of a variable, allocating a new one if needed.
+        Args:
+            name (str): The variable name.
+        Returns:
+            int: The slot of the variable.
+        """
+        slot = self.symbols.get(name)
+        if slot is None:
+            slot = self.symbols[name] = len(self.variables)
+            self.variables.append(UNDEFINED)
+        return slot
+
+    def set_symbols(self, symbols):
+        """
+        Replace the symbol table, as when loading a program parsed against another environment.
+        Args:
+            symbols (dict): Mapping of variable names to slots.
+        """
+        self.symbols = dict(symbols)
+        self.variables[:] = [UNDEFINED] * len(self.symbols)
+
+    def reset(self):
+        """
+        Reset the registers and clear all variable values, keeping their slots.
+        """
+        self.program_counter = 0
+        self.current_line = -1
+        self.jump = NO_JUMP
+        self.return_depth = 0
+        # Cleared in place since compiled programs hold on to the list
+        self.variables[:] = [UNDEFINED] * len(self.variables)
+
+    def snapshot(self):
+        """
+        Get the registers and assigned variables of the environment.
+        Returns:
+            dict: The environment state, with variables keyed by name.
+        """
+        variables = self.variables
+        return {
+            "program_counter": self.program_counter,
+            "current_line": self.current_line,
+            "variables": {
+                name: variables[slot]
+                for name, slot in self.symbols.items()
+                if variables[slot] is not UNDEFINED
+            },
+            "return_stack": self.return_stack[:self.return_depth],
+        }
+
+    def restore(self, state):
+        """
+        Restore the registers and variables from a snapshot.
+        Args:
+            state (dict): A snapshot taken from an environment running the same program.
+        """
+        for name in state["variables"]:
+            if name not in self.symbols:
+                raise BasicRuntimeError(f"Snapshot variable {name} is not used by the program.")
+
+        self.reset()
+        self.program_counter = state["program_counter"]
+        self.current_line = state["current_line"]
+        for name, value in state["variables"].items():
+            self.variables[self.symbols[name]] = value
+
+        return_stack = state.get("return_stack", [])
+        self.return_stack[:len(return_stack)] = return_stack
+        self.return_depth = len(return_stack)
+
+class RunResult:
+    """
+    A class describing how a BASIC run ended.
+
+    Attributes:
+        status (str): One of FINISHED, INTERRUPTED, STEP_LIMIT or TIME_LIMIT.
+        steps (int): The number of lines executed.
+        line (int): The number of the next line that would have run, or None if the program finished.
+        elapsed (float): The wall-clock time of the run in seconds.
+    """
+
+    FINISHED = "finished"
+    INTERRUPTED = "interrupted"
+    STEP_LIMIT = "step_limit"
+    TIME_LIMIT = "time_limit"
+
+    __slots__ = ("status", "steps", "line", "elapsed")
+
+    def __init__(self, status, steps, line, elapsed):
+        self.status = status
+        self.steps = steps
+        self.line = line
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f"RunResult({self.status}, {self.steps} steps, line {self.line}, {self.elapsed:.3f}s)"
+
+    @property
+    def limit_exceeded(self):
+        """
+        Whether the run was stopped by a step or time limit.
+        """
+        return self.status in (RunResult.STEP_LIMIT, RunResult.TIME_LIMIT)
+
+    def message(self):
+        """
+        Describe how the run ended.
+        """
+        if self.status == RunResult.STEP_LIMIT:
+            return f"Step limit exceeded at line {self.line} after {self.steps} steps."
+        if self.status == RunResult.TIME_LIMIT:
+            return f"Time limit exceeded at line {self.line} after {self.steps} steps ({self.elapsed:.3f}s)."
+        if self.status == RunResult.INTERRUPTED:
+            return f"Interrupted at line {self.line} after {self.steps} steps."
+        return f"Finished after {self.steps} steps."
+
+    def to_dict(self):
+        """
+        Get the result as a plain dict.
+        """
+        return {"status": self.status, "steps": self.steps, "line": self.line, "elapsed": self.elapsed}
+
+class Token:
+    """
+    A class representing a BASIC token.
+
+    Attributes:
+        kind (str): The token kind, one of the TOKEN_* constants.
+        text (str): The source text of the token.
+        column (int): The column the token starts at.
+    """
+
+    __slots__ = ("kind", "text", "column")
+
+    def __init__(self, kind, text, column):
+        self.kind = kind
+        self.text = text
+        self.column = column
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r}, {self.column})"
+
+class TokenStream:
+    """
+    A cursor over a list of tokens, used by the parser.
+
+    Attributes:
+        tokens (list): The tokens being parsed.
+        position (int): The index of the next token.
+    """
+
+    __slots__ = ("tokens", "position")
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def __repr__(self):
+        return f"TokenStream({self.tokens[self.position:]})"
+
+    def at_end(self):
+        """
+        Check whether all tokens have been consumed.
+        """
+        return self.position >= len(self.tokens)
+
+    def remaining(self):
+        """
+        Get the number of tokens left.
+        """
+        return len(self.tokens) - self.position
+
+    def peek(self, offset=0):
+        """
+        Get an upcoming token without consuming it.
+        Returns:
+            Token: The token, or None past the end of the stream.
+        """
+        index = self.position + offset
+        if index < len(self.tokens):
+            return self.tokens[index]
+        return None
+
+    def next(self):
+        """
+        Consume the next token.
+        Returns:
+            Token: The token, or None past the end of the stream.
+        """
+        token = self.peek()
+        if token is not None:
+            self.position += 1
+        return token
+
+    def rest(self):
+        """
+        Get the text of the remaining tokens, without consuming them.
+        """
+        return self.text_from(self.position)
+
+    def text_from(self, start):
+        """
+        Get the text of the tokens from a position to the end, as for error messages.
+        """
+        return ' '.join(token.text for token in self.tokens[start:])
 
 class Expression:
     """
@@ -25,6 +343,12 @@ class Expression:
         """
         raise NotImplementedError("Expression evaluation must be implemented in subclasses.")
 
+    def compile(self, environment):
+        """
+        Compile the expression into a function of the environment.
+        """
+        raise NotImplementedError("Expression compilation must be implemented in subclasses.")
+
 class Value(Expression):
     """
     A class representing a BASIC value.
@@ -54,17 +378,26 @@ class Value(Expression):
         """
         return self.value
 
+    def compile(self, environment):
+        """
+        Compile the value.
+        """
+        value = self.value
+        return lambda environment: value
+
 class Identifier(Value):
     """
     A class representing a BASIC identifier.
     
     Attributes:
         name (str): The name of the identifier.
+        slot (int): The slot holding the variable's value.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, slot):
         super().__init__(None)
         self.name = name
+        self.slot = slot
 
     def __repr__(self):
         return f"Identifier({self.name})"
@@ -73,11 +406,178 @@ class Identifier(Value):
         """
         Evaluate the identifier.
         """
-        if self.name in environment:
-            self.value = environment[self.name]
-            return environment[self.name]
-        else:
+        value = environment.variables[self.slot]
+        if value is UNDEFINED:
             raise NameError(f"Undefined variable: {self.name}")
+        return value
+
+    def compile(self, environment):
+        """
+        Compile the identifier.
+        """
+        name = self.name
+        slot = self.slot
+        variables = environment.variables
+
+        def identifier(environment):
+            value = variables[slot]
+            if value is UNDEFINED:
+                raise NameError(f"Undefined variable: {name}")
+            return value
+
+        return identifier
+
+class Element(Expression):
+    """
+    A class representing an element of a BASIC array.
+
+    Arrays hold floating point numbers in an array.array('d') and are
+    indexed from 0 to the size given to DIM, inclusive.
+
+    Attributes:
+        name (str): The name of the array.
+        slot (int): The slot holding the array.
+        index (Expression): The expression of the element index.
+    """
+
+    def __init__(self, name, slot, index):
+        super().__init__()
+        self.name = name
+        self.slot = slot
+        self.index = index
+
+    def __repr__(self):
+        return f"Element({self.name}, {self.index})"
+
+    def evaluate(self, environment):
+        """
+        Evaluate the element.
+        """
+        values = environment.variables[self.slot]
+        index = self.index.evaluate(environment)
+        try:
+            if index < 0:
+                raise IndexError()
+            return values[int(index)]
+        except (IndexError, TypeError, ValueError):
+            raise self.error(values, index) from None
+
+    def assign(self, environment, value):
+        """
+        Store a value in the element.
+        Returns:
+            int: The index the value was stored at.
+        """
+        values = environment.variables[self.slot]
+        index = self.index.evaluate(environment)
+        try:
+            if index < 0:
+                raise IndexError()
+            position = int(index)
+            values[position] = value
+        except (IndexError, TypeError, ValueError):
+            raise self.error(values, index, value) from None
+        return position
+
+    def compile(self, environment):
+        """
+        Compile the element.
+        """
+        slot = self.slot
+        variables = environment.variables
+        index = self.index.compile(environment)
+        error = self.error
+
+        def element(environment):
+            values = variables[slot]
+            position = index(environment)
+            try:
+                if position < 0:
+                    raise IndexError()
+                return values[int(position)]
+            except (IndexError, TypeError, ValueError):
+                raise error(values, position) from None
+
+        return element
+
+    def compile_assign(self, environment):
+        """
+        Compile storing a value in the element.
+        """
+        slot = self.slot
+        variables = environment.variables
+        index = self.index.compile(environment)
+        error = self.error
+
+        def assign_element(environment, value):
+            values = variables[slot]
+            position = index(environment)
+            try:
+                if position < 0:
+                    raise IndexError()
+                values[int(position)] = value
+            except (IndexError, TypeError, ValueError):
+                raise error(values, position, value) from None
+
+        return assign_element
+
+    def error(self, values, index, value=0):
+        """
+        Describe a failed element access.
+        Returns:
+            BasicRuntimeError: The error to raise.
+        """
+        if type(values) is not array.array:
+            return BasicRuntimeError(f"Array {self.name} is not dimensioned.")
+        if not isinstance(index, (int, float)) or isinstance(index, bool):
+            return BasicRuntimeError(f"Index of array {self.name} must be a number, not {index!r}.")
+        if not isinstance(value, (int, float)):
+            return BasicRuntimeError(f"Array {self.name} holds numbers, not {value!r}.")
+        return BasicRuntimeError(f"Index {index} out of range for array {self.name}({len(values) - 1}).")
+
+class ArrayFunction(Expression):
+    """
+    A class representing a built-in function over a whole BASIC array, such as SUM(A).
+
+    Attributes:
+        name (str): The name of the function, a key of ARRAY_FUNCTIONS.
+        array (Identifier): The array the function is applied to.
+    """
+
+    def __init__(self, name, array):
+        super().__init__()
+        self.name = name
+        self.array = array
+        self.function = ARRAY_FUNCTIONS[name]
+
+    def __repr__(self):
+        return f"ArrayFunction({self.name}, {self.array})"
+
+    def evaluate(self, environment):
+        """
+        Evaluate the function.
+        """
+        values = environment.variables[self.array.slot]
+        if type(values) is not array.array:
+            raise BasicRuntimeError(f"Array {self.array.name} is not dimensioned.")
+        return self.function(values)
+
+    def compile(self, environment):
+        """
+        Compile the function.
+        """
+        function = self.function
+        name = self.array.name
+        slot = self.array.slot
+        variables = environment.variables
+
+        def array_function(environment):
+            values = variables[slot]
+            if type(values) is not array.array:
+                raise BasicRuntimeError(f"Array {name} is not dimensioned.")
+            return function(values)
+
+        return array_function
 
 class Operation(Expression):
     """
@@ -85,13 +585,18 @@ class Operation(Expression):
 
     Attributes:
         operator (str): The operator for the operation.
+        function (callable): The function implementing the operator.
         left (Expression): The left operand.
         right (Expression): The right operand.
     """
     
     def __init__(self, operator, left, right):
         super().__init__()
+        if operator not in OPERATORS:
+            raise ValueError(f"Invalid operator: {operator}")
+
         self.operator = operator
+        self.function = OPERATORS[operator]
         self.left = left
         self.right = right
 
@@ -99,47 +604,135 @@ class Operation(Expression):
         """
         Evaluate the operation.
         """
+        return self.function(self.left.evaluate(environment), self.right.evaluate(environment))
 
-        # Evaluate the left and right operands
-        left_value = self.left.evaluate(environment)
-        right_value = self.right.evaluate(environment)
-
-        result = 0
-
-        # Arithmetic operations
-        if self.operator == '+':
-            result = left_value + right_value
-        elif self.operator == '-':
-            result = left_value - right_value
-        elif self.operator == '*':
-            result = left_value * right_value
-        elif self.operator == '/':
-            result = left_value / right_value
-
-        # Logical operations
-        elif self.operator == '==':
-            result = left_value == right_value
-        elif self.operator == '<':
-            result = left_value < right_value
-        elif self.operator == '>':
-            result = left_value > right_value
-        elif self.operator == '<=':
-            result = left_value <= right_value
-        elif self.operator == '>=':
-            result = left_value >= right_value
-        elif self.operator == '!=':
-            result = left_value != right_value
+    def compile(self, environment):
+        """
+        Compile the operation.
+        """
+        function = self.function
+        left = self.left.compile(environment)
+        right = self.right.compile(environment)
 
-        else:
-            raise ValueError(f"Invalid operator: {self.operator}")
+        return lambda environment: function(left(environment), right(environment))
 
-        if environment["__verbose"]:
-            click.echo(f"Evaluated: {self.left} {self.operator} {self.right} = {result}")
+    def __repr__(self):
+        return f"Operation({self.left} {self.operator} {self.right})"
 
+class TracedOperation(Operation):
+    """
+    A BASIC operation that echoes each evaluation, used in verbose mode.
+    """
+
+    def evaluate(self, environment):
+        """
+        Evaluate the operation and echo the result.
+        """
+        result = super().evaluate(environment)
+        click.echo(f"Evaluated: {self.left} {self.operator} {self.right} = {result}")
         return result
 
+    def compile(self, environment):
+        """
+        Compile the operation, echoing the result of each evaluation.
+        """
+        operation = super().compile(environment)
+
+        def traced_operation(environment):
+            result = operation(environment)
+            click.echo(f"Evaluated: {self.left} {self.operator} {self.right} = {result}")
+            return result
+
+        return traced_operation
+
+class Chain(Expression):
+    """
+    A class representing a run of binary operations of the same precedence, such as A + B - C.
+
+    The operations are applied left to right in a loop, so a long run is
+    evaluated without one level of recursion per operator.
+
+    Attributes:
+        operators (list): The operator of each operation.
+        functions (list): The functions implementing the operators.
+        operands (list): The operands, one more than the operators.
+    """
+
+    def __init__(self, operators, operands):
+        super().__init__()
+        for operator in operators:
+            if operator not in OPERATORS:
+                raise ValueError(f"Invalid operator: {operator}")
+        if len(operands) != len(operators) + 1:
+            raise ValueError("A chain needs one more operand than operators.")
+
+        self.operators = operators
+        self.functions = [OPERATORS[operator] for operator in operators]
+        self.operands = operands
+
+    def evaluate(self, environment):
+        """
+        Evaluate the operations from left to right.
+        """
+        operands = self.operands
+        value = operands[0].evaluate(environment)
+        for index, function in enumerate(self.functions, start=1):
+            value = function(value, operands[index].evaluate(environment))
+        return value
+
+    def compile(self, environment):
+        """
+        Compile the chain.
+        """
+        first = self.operands[0].compile(environment)
+        steps = tuple(zip(self.functions, [operand.compile(environment) for operand in self.operands[1:]]))
+
+        def chain(environment):
+            value = first(environment)
+            for function, operand in steps:
+                value = function(value, operand(environment))
+            return value
+
+        return chain
+
+    def text(self):
+        """
+        Format the chain as its operands separated by operators.
+        """
+        parts = [repr(self.operands[0])]
+        for operator, operand in zip(self.operators, self.operands[1:]):
+            parts.append(operator)
+            parts.append(repr(operand))
+        return ' '.join(parts)
+
     def __repr__(self):
-        return f"Operation({self.left} {self.operator} {self.right})"
+        return f"Chain({self.text()})"
+
+class TracedChain(Chain):
+    """
+    A run of BASIC operations that echoes each evaluation, used in verbose mode.
+    """
+
+    def evaluate(self, environment):
+        """
+        Evaluate the chain and echo the result.
+        """
+        result = super().evaluate(environment)
+        click.echo(f"Evaluated: {self.text()} = {result}")
+        return result
+
+    def compile(self, environment):
+        """
+        Compile the chain, echoing the result of each evaluation.
+        """
+        chain = super().compile(environment)
+
+        def traced_chain(environment):
+            result = chain(environment)
+            click.echo(f"Evaluated: {self.text()} = {result}")
+            return result
+
+        return traced_chain
 
 class Line:
     """
@@ -166,6 +759,19 @@ class Line:
         else:
             raise TypeError("Statement must be an instance of Statement class.")
 
+    def compile(self, environment, line_index, index):
+        """
+        Compile the line into a function that executes it and returns the index of the next line.
+        Args:
+            environment (Environment): The interpreter environment.
+            line_index (dict): Mapping of line numbers to program indices.
+            index (int): The index of this line in the program.
+        """
+        if not isinstance(self.statement, Statement):
+            raise TypeError("Statement must be an instance of Statement class.")
+
+        return self.statement.compile(environment, line_index, index + 1)
+
 class Statement:
     """
     Base class for BASIC statements.
@@ -183,6 +789,53 @@ class Statement:
         """
         raise NotImplementedError("Statement execution must be implemented in subclasses.")
 
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the statement into a function that executes it and returns the index of the next line.
+        Args:
+            environment (Environment): The interpreter environment.
+            line_index (dict): Mapping of line numbers to program indices.
+            next_index (int): The index of the line following this one.
+        """
+        raise NotImplementedError("Statement compilation must be implemented in subclasses.")
+
+    def assignments(self):
+        """
+        Get the variables and array elements the statement assigns, for tracers.
+        Returns:
+            tuple: The assigned Identifier and Element objects.
+        """
+        return ()
+
+    def trace(self, environment, tracer):
+        """
+        Execute the statement, reporting each assignment to the tracer as it is made.
+
+        Only called for statements that never jump, which the traced run loop
+        executes itself in place of the engine.
+        Args:
+            environment (Environment): The interpreter environment.
+            tracer (Tracer): The tracer to report assignments to.
+        """
+        self.execute(environment)
+        for identifier in self.assignments():
+            tracer.assignment(environment, identifier.name, environment.variables[identifier.slot])
+
+    def compile_jump(self, line_index, line_number):
+        """
+        Resolve a jump target to a program index.
+        Returns:
+            function: A function returning the target index, or reporting an undefined line.
+        """
+        if line_number in line_index:
+            target = line_index[line_number]
+            return lambda environment: target
+
+        def undefined(environment):
+            raise BasicRuntimeError(f"Undefined line number: {line_number}")
+
+        return undefined
+
 class RemStatement(Statement):
     """
     A class representing a REM statement.
@@ -203,6 +856,12 @@ class RemStatement(Statement):
         """
         pass
 
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the REM statement.
+        """
+        return lambda environment: next_index
+
 class PrintStatement(Statement):
     """
     A class representing a PRINT statement.
@@ -223,7 +882,19 @@ class PrintStatement(Statement):
         Execute the PRINT statement.
         """
         value = self.expression.evaluate(environment)
-        click.echo(value)
+        environment.output.write(value)
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the PRINT statement.
+        """
+        expression = self.expression.compile(environment)
+
+        def print_statement(environment):
+            environment.output.write(expression(environment))
+            return next_index
+
+        return print_statement
 
 class InputStatement(Statement):
     """
@@ -246,19 +917,39 @@ class InputStatement(Statement):
     def __repr__(self):
         return f"InputStatement({self.identifier}, {self.prompt})"
 
+    def assignments(self):
+        return (self.identifier,)
+
     def execute(self, environment):
         """
         Execute the INPUT statement.
         """
-        value = click.prompt(self.prompt if self.prompt else "", type=str)
+        # Show pending output before waiting for input
+        environment.output.flush()
 
-        # Automatically cast to number if possible
         try:
-            value = int(value)
-        except ValueError:
-            pass # Ignore error
-        finally:
-            environment[self.identifier.name] = value
+            value = environment.input.read(self.prompt)
+        except EOFError:
+            raise BasicRuntimeError("Ran out of input values.") from None
+
+        # Automatically cast text to a number if possible
+        if isinstance(value, str):
+            try:
+                value = int(value)
+            except ValueError:
+                pass # Ignore error
+
+        environment.variables[self.identifier.slot] = value
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the INPUT statement.
+        """
+        def input_statement(environment):
+            self.execute(environment)
+            return next_index
+
+        return input_statement
 
 class GotoStatement(Statement):
     """
@@ -280,10 +971,13 @@ class GotoStatement(Statement):
         Execute the GOTO statement.
         """
         # Set the program counter to the specified line number
-        environment['__current_line'] = self.line_number
+        environment.jump = self.line_number
 
-        if environment["__verbose"]:
-            click.echo(f"GOTO {self.line_number}")
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the GOTO statement.
+        """
+        return self.compile_jump(line_index, self.line_number)
 
 class LetStatement(Statement):
     """
@@ -302,15 +996,117 @@ class LetStatement(Statement):
     def __repr__(self):
         return f"LetStatement({self.identifier}, {self.expression})"
 
+    def assignments(self):
+        return (self.identifier,)
+
     def execute(self, environment):
         """
         Execute the LET statement.
         """
         value = self.expression.evaluate(environment)
-        environment[self.identifier.name] = value
+        environment.variables[self.identifier.slot] = value
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the LET statement.
+        """
+        slot = self.identifier.slot
+        variables = environment.variables
+        expression = self.expression.compile(environment)
+
+        def let_statement(environment):
+            variables[slot] = expression(environment)
+            return next_index
+
+        return let_statement
+
+class LetElementStatement(Statement):
+    """
+    A class representing a LET statement assigning an array element.
+
+    Attributes:
+        element (Element): The element to assign the value to.
+        expression (Expression): The expression to evaluate and assign.
+    """
+
+    def __init__(self, line, element, expression):
+        super().__init__(line)
+        self.element = element
+        self.expression = expression
+
+    def __repr__(self):
+        return f"LetElementStatement({self.element}, {self.expression})"
+
+    def assignments(self):
+        return (self.element,)
+
+    def trace(self, environment, tracer):
+        """
+        Execute the LET statement, reporting the element at the index it was stored at.
+        """
+        element = self.element
+        position = element.assign(environment, self.expression.evaluate(environment))
+        tracer.assignment(environment, f"{element.name}({position})", environment.variables[element.slot][position])
+
+    def execute(self, environment):
+        """
+        Execute the LET statement.
+        """
+        self.element.assign(environment, self.expression.evaluate(environment))
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the LET statement.
+        """
+        assign = self.element.compile_assign(environment)
+        expression = self.expression.compile(environment)
+
+        def let_element_statement(environment):
+            assign(environment, expression(environment))
+            return next_index
+
+        return let_element_statement
+
+class DimStatement(Statement):
+    """
+    A class representing a DIM statement.
+
+    Attributes:
+        arrays (list): Pairs of the Identifier of each array and the Expression of its size.
+    """
+
+    def __init__(self, line, arrays):
+        super().__init__(line)
+        self.arrays = arrays
+
+    def __repr__(self):
+        return f"DimStatement({', '.join(f'{identifier}({size})' for identifier, size in self.arrays)})"
+
+    def execute(self, environment):
+        """
+        Execute the DIM statement, allocating each array filled with zeros.
+        """
+        for identifier, size in self.arrays:
+            environment.variables[identifier.slot] = self.allocate(identifier, size.evaluate(environment))
 
-        if environment["__verbose"]:
-            click.echo(f"LET {self.identifier.name} = {value}")
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the DIM statement.
+        """
+        def dim_statement(environment):
+            self.execute(environment)
+            return next_index
+
+        return dim_statement
+
+    @staticmethod
+    def allocate(identifier, size):
+        """
+        Allocate a zeroed array indexed from 0 to size.
+        """
+        if isinstance(size, bool) or not isinstance(size, (int, float)) or size < 0 or size != int(size):
+            raise BasicRuntimeError(f"Invalid size for array {identifier.name}: {size!r}")
+        return array.array('d', bytes(8 * (int(size) + 1)))
 
 class IfStatement (Statement): # IF <expression> GOTO <line_number>
     """
@@ -334,7 +1130,21 @@ class IfStatement (Statement): # IF <expression> GOTO <line_number>
         Execute the IF statement.
         """
         if self.condition.evaluate(environment):
-            environment['__current_line'] = self.line_number
+            environment.jump = self.line_number
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the IF statement.
+        """
+        condition = self.condition.compile(environment)
+        jump = self.compile_jump(line_index, self.line_number)
+
+        def if_statement(environment):
+            if condition(environment):
+                return jump(environment)
+            return next_index
+
+        return if_statement
 
 class ElseStatement(Statement):
     """
@@ -355,4 +1165,402 @@ class ElseStatement(Statement):
         """
         Execute the ELSE statement.
         """
-        environment['__current_line'] = self.line_number
+        environment.jump = self.line_number
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the ELSE statement.
+        """
+        return self.compile_jump(line_index, self.line_number)
+
+class LinkedStatement(Statement):
+    """
+    Base class for statements whose jump targets depend on the lines around them,
+    such as the statements opening and closing loops.
+
+    Linked statements are resolved once the whole program is known, when
+    the interpreter links the program, and each stores the line numbers it
+    jumps to. Compiling resolves those to program indices.
+    """
+
+class ForStatement(LinkedStatement): # FOR <identifier> = <expression> TO <expression> [STEP <expression>]
+    """
+    A class representing a FOR statement.
+
+    The limit and step are evaluated once when the loop starts and kept in
+    hidden variable slots, so NEXT only adds and compares numbers.
+
+    Attributes:
+        identifier (Identifier): The loop counter.
+        start (Expression): The initial value of the counter.
+        end (Expression): The limit of the counter.
+        step (Expression): The amount added to the counter by NEXT.
+        limit_slot (int): The slot holding the evaluated limit.
+        step_slot (int): The slot holding the evaluated step.
+        exit_line (int): The line after the matching NEXT, set when the program is linked.
+    """
+
+    def __init__(self, line, identifier, start, end, step, limit_slot, step_slot):
+        super().__init__(line)
+        self.identifier = identifier
+        self.start = start
+        self.end = end
+        self.step = step
+        self.limit_slot = limit_slot
+        self.step_slot = step_slot
+        self.exit_line = None
+
+    def __repr__(self):
+        return f"ForStatement({self.identifier}, {self.start}, {self.end}, {self.step})"
+
+    def assignments(self):
+        return (self.identifier,)
+
+    def execute(self, environment):
+        """
+        Execute the FOR statement, skipping the loop if the counter starts past the limit.
+        """
+        variables = environment.variables
+        value = variables[self.identifier.slot] = self.start.evaluate(environment)
+        limit = variables[self.limit_slot] = self.end.evaluate(environment)
+        step = variables[self.step_slot] = self.step.evaluate(environment)
+
+        if value > limit if step >= 0 else value < limit:
+            environment.jump = self.exit_line
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the FOR statement.
+        """
+        slot = self.identifier.slot
+        limit_slot = self.limit_slot
+        step_slot = self.step_slot
+        variables = environment.variables
+        start = self.start.compile(environment)
+        end = self.end.compile(environment)
+        step = self.step.compile(environment)
+        exit_index = line_index[self.exit_line]
+
+        def for_statement(environment):
+            value = variables[slot] = start(environment)
+            limit = variables[limit_slot] = end(environment)
+            increment = variables[step_slot] = step(environment)
+            if value > limit if increment >= 0 else value < limit:
+                return exit_index
+            return next_index
+
+        return for_statement
+
+class NextStatement(LinkedStatement): # NEXT [<identifier>]
+    """
+    A class representing a NEXT statement.
+
+    Attributes:
+        name (str): The counter named by the statement, or None to close the innermost FOR.
+        loop (ForStatement): The matching FOR statement, set when the program is linked.
+        body_line (int): The first line of the loop body, set when the program is linked.
+    """
+
+    def __init__(self, line, name=None):
+        super().__init__(line)
+        self.name = name
+        self.loop = None
+        self.body_line = None
+
+    def __repr__(self):
+        return f"NextStatement({self.name})" if self.name else "NextStatement()"
+
+    def assignments(self):
+        return (self.loop.identifier,) if self.loop else ()
+
+    def execute(self, environment):
+        """
+        Execute the NEXT statement, stepping the counter and looping while it is within the limit.
+        """
+        loop = self.loop
+        slot = loop.identifier.slot
+        variables = environment.variables
+        step = variables[loop.step_slot]
+        limit = variables[loop.limit_slot]
+        if step is UNDEFINED:
+            raise BasicRuntimeError("NEXT without FOR.")
+
+        value = variables[slot] = variables[slot] + step
+        if value <= limit if step >= 0 else value >= limit:
+            environment.jump = self.body_line
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the NEXT statement, specialized for a constant step of known sign.
+        """
+        loop = self.loop
+        slot = loop.identifier.slot
+        limit_slot = loop.limit_slot
+        step_slot = loop.step_slot
+        variables = environment.variables
+        body_index = line_index[self.body_line]
+
+        # Comparing with the UNDEFINED limit of a FOR that never ran raises TypeError, so the fast path needs no check
+        def not_started():
+            if variables[step_slot] is UNDEFINED:
+                raise BasicRuntimeError("NEXT without FOR.") from None
+
+        if type(loop.step) is Value and isinstance(loop.step.value, (int, float)):
+            step = loop.step.value
+
+            if step >= 0:
+                def next_statement(environment):
+                    try:
+                        value = variables[slot] = variables[slot] + step
+                        if value <= variables[limit_slot]:
+                            return body_index
+                    except TypeError:
+                        not_started()
+                        raise
+                    return next_index
+            else:
+                def next_statement(environment):
+                    try:
+                        value = variables[slot] = variables[slot] + step
+                        if value >= variables[limit_slot]:
+                            return body_index
+                    except TypeError:
+                        not_started()
+                        raise
+                    return next_index
+
+            return next_statement
+
+        def next_statement(environment):
+            step = variables[step_slot]
+            if step is UNDEFINED:
+                raise BasicRuntimeError("NEXT without FOR.")
+            value = variables[slot] = variables[slot] + step
+            if value <= variables[limit_slot] if step >= 0 else value >= variables[limit_slot]:
+                return body_index
+            return next_index
+
+        return next_statement
+
+class WhileStatement(LinkedStatement): # WHILE <expression>
+    """
+    A class representing a WHILE statement.
+
+    Attributes:
+        condition (Expression): The condition to evaluate.
+        exit_line (int): The line after the matching WEND, set when the program is linked.
+    """
+
+    def __init__(self, line, condition):
+        super().__init__(line)
+        self.condition = condition
+        self.exit_line = None
+
+    def __repr__(self):
+        return f"WhileStatement({self.condition})"
+
+    def execute(self, environment):
+        """
+        Execute the WHILE statement, skipping the loop if the condition is false.
+        """
+        if not self.condition.evaluate(environment):
+            environment.jump = self.exit_line
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the WHILE statement.
+        """
+        condition = self.condition.compile(environment)
+        exit_index = line_index[self.exit_line]
+
+        def while_statement(environment):
+            if condition(environment):
+                return next_index
+            return exit_index
+
+        return while_statement
+
+class WendStatement(LinkedStatement): # WEND
+    """
+    A class representing a WEND statement.
+
+    WEND tests the condition of its WHILE itself and jumps straight into
+    the loop body, rather than back to the WHILE line.
+
+    Attributes:
+        loop (WhileStatement): The matching WHILE statement, set when the program is linked.
+        body_line (int): The first line of the loop body, set when the program is linked.
+    """
+
+    def __init__(self, line):
+        super().__init__(line)
+        self.loop = None
+        self.body_line = None
+
+    def __repr__(self):
+        return f"WendStatement()"
+
+    def execute(self, environment):
+        """
+        Execute the WEND statement.
+        """
+        if self.loop.condition.evaluate(environment):
+            environment.jump = self.body_line
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the WEND statement.
+        """
+        condition = self.loop.condition.compile(environment)
+        body_index = line_index[self.body_line]
+
+        def wend_statement(environment):
+            if condition(environment):
+                return body_index
+            return next_index
+
+        return wend_statement
+
+class GosubStatement(LinkedStatement): # GOSUB <line_number>
+    """
+    A class representing a GOSUB statement.
+
+    Attributes:
+        line_number (int): The first line of the subroutine.
+        return_line (int): The line after the GOSUB, set when the program is linked.
+        inline (tuple): The statements of the subroutine when it is inlined by the optimizer, or None to call it.
+    """
+
+    def __init__(self, line, line_number):
+        super().__init__(line)
+        self.line_number = line_number
+        self.return_line = None
+        self.inline = None
+
+    def __repr__(self):
+        return f"GosubStatement({self.line_number})"
+
+    def assignments(self):
+        if self.inline is None:
+            return ()
+        return tuple(target for statement in self.inline for target in statement.assignments())
+
+    def trace(self, environment, tracer):
+        """
+        Execute the inlined subroutine one statement at a time, reporting each assignment as it is made.
+        """
+        if self.inline is None:
+            self.execute(environment)
+            return
+        for statement in self.inline:
+            statement.trace(environment, tracer)
+
+    def execute(self, environment):
+        """
+        Execute the GOSUB statement, or the inlined subroutine in its place.
+        """
+        if self.inline is not None:
+            for statement in self.inline:
+                statement.execute(environment)
+            return
+
+        depth = environment.return_depth
+        if depth == MAX_GOSUB_DEPTH:
+            raise BasicRuntimeError(f"GOSUB nested deeper than {MAX_GOSUB_DEPTH} calls.")
+        environment.return_stack[depth] = self.return_line
+        environment.return_depth = depth + 1
+        environment.jump = self.line_number
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the GOSUB statement, running an inlined subroutine directly.
+        """
+        if self.inline is not None:
+            statements = tuple(statement.compile(environment, line_index, next_index) for statement in self.inline)
+
+            def inlined_gosub_statement(environment):
+                for statement in statements:
+                    statement(environment)
+                return next_index
+
+            return inlined_gosub_statement
+
+        jump = self.compile_jump(line_index, self.line_number)
+        return_line = self.return_line
+        stack = environment.return_stack
+
+        def gosub_statement(environment):
+            depth = environment.return_depth
+            if depth == MAX_GOSUB_DEPTH:
+                raise BasicRuntimeError(f"GOSUB nested deeper than {MAX_GOSUB_DEPTH} calls.")
+            stack[depth] = return_line
+            environment.return_depth = depth + 1
+            return jump(environment)
+
+        return gosub_statement
+
+class ReturnStatement(Statement): # RETURN
+    """
+    A class representing a RETURN statement.
+    """
+
+    def __init__(self, line):
+        super().__init__(line)
+
+    def __repr__(self):
+        return f"ReturnStatement()"
+
+    def execute(self, environment):
+        """
+        Execute the RETURN statement.
+        """
+        depth = environment.return_depth - 1
+        if depth < 0:
+            raise BasicRuntimeError("RETURN without GOSUB.")
+        environment.return_depth = depth
+        environment.jump = environment.return_stack[depth]
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the RETURN statement.
+        """
+        stack = environment.return_stack
+
+        def return_statement(environment):
+            depth = environment.return_depth - 1
+            if depth < 0:
+                raise BasicRuntimeError("RETURN without GOSUB.")
+            environment.return_depth = depth
+            return line_index[stack[depth]]
+
+        return return_statement
+
+class EndStatement(Statement):
+    """
+    A class representing an END statement.
+    """
+
+    def __init__(self, line):
+        super().__init__(line)
+
+    def __repr__(self):
+        return f"EndStatement()"
+
+    def execute(self, environment):
+        """
+        Execute the END statement.
+        """
+        environment.output.flush()
+        environment.jump = END_OF_PROGRAM
+
+    def compile(self, environment, line_index, next_index):
+        """
+        Compile the END statement.
+        """
+        end = line_index[END_OF_PROGRAM]
+
+        def end_statement(environment):
+            environment.output.flush()
+            return end
+
+        return end_statement
@@ -0,0 +1,19 @@
+"""
+interpreters/basic/errors.py
+BASIC interpreter errors
+"""
+
+class BasicError(Exception):
+    """
+    Base class for errors reported by BASIC programs.
+    """
+
+class BasicSyntaxError(BasicError, ValueError):
+    """
+    An error in the source of a BASIC program.
+    """
+
+class BasicRuntimeError(BasicError):
+    """
+    An error raised while running a BASIC program.
+    """
@@ -0,0 +1,233 @@
+"""
+interpreters/basic/optimizer.py
+Optimization passes over parsed BASIC programs
+"""
+
+import interpreters.basic.classes as classes
+
+# Longest subroutine body, in statements, that inline_subroutines copies into its callers
+INLINE_LIMIT = 4
+
+# Statements that never jump, so a run of them can be executed in place of a GOSUB
+STRAIGHT_LINE_STATEMENTS = (
+    classes.LetStatement,
+    classes.LetElementStatement,
+    classes.PrintStatement,
+    classes.RemStatement,
+)
+
+# Operand values that leave the other operand unchanged, by operator and side, and the
+# types the other operand must provably have. Strings and booleans are never simplified,
+# and x + 0 is kept for floats since -0.0 + 0 is 0.0.
+IDENTITIES = {
+    '+': ({"left": 0, "right": 0}, (int,)),
+    '-': ({"right": 0}, (int, float)),
+    '*': ({"left": 1, "right": 1}, (int, float)),
+}
+
+# Operators whose result is a number when both operands are
+ARITHMETIC_OPERATORS = {'+', '-', '*', '/'}
+
+def optimize_program(program):
+    """
+    Optimize every statement of a program in place.
+    Args:
+        program (dict): Mapping of line numbers to Line objects.
+    Returns:
+        int: The number of expression nodes folded away.
+    """
+    folded = 0
+    for line in program.values():
+        folded += optimize_statement(line.statement)
+    return folded
+
+def optimize_statement(statement):
+    """
+    Fold the expressions held by a statement in place.
+    Args:
+        statement (Statement): The statement to optimize.
+    Returns:
+        int: The number of expression nodes folded away.
+    """
+    folded = 0
+    for attribute, value in vars(statement).items():
+        if isinstance(value, (classes.Operation, classes.Chain, classes.Element)):
+            expression, count = fold_expression(value)
+            setattr(statement, attribute, expression)
+            folded += count
+    return folded
+
+def inline_subroutines(program, line_numbers, line_index, limit=INLINE_LIMIT):
+    """
+    Inline small leaf subroutines into the GOSUB statements calling them.
+
+    A subroutine is inlined when its lines up to the first RETURN are at
+    most limit straight-line statements. The GOSUB then runs them as one
+    step, without touching the return stack. Must run after linking, which
+    resets the inlined statements.
+    Args:
+        program (dict): Mapping of line numbers to Line objects.
+        line_numbers (list): The sorted line numbers of the program.
+        line_index (dict): The jump table of line_numbers.
+        limit (int): The largest number of statements to inline.
+    Returns:
+        int: The number of GOSUB statements inlined.
+    """
+    bodies = {}
+    inlined = 0
+
+    for line in program.values():
+        statement = line.statement
+        if type(statement) is not classes.GosubStatement or statement.line_number not in line_index:
+            continue
+
+        target = statement.line_number
+        if target not in bodies:
+            bodies[target] = subroutine_body(program, line_numbers, line_index[target], limit)
+
+        if bodies[target] is not None:
+            statement.inline = bodies[target]
+            inlined += 1
+
+    return inlined
+
+def subroutine_body(program, line_numbers, index, limit):
+    """
+    Get the statements of a leaf subroutine starting at index, if it is small and straight-line.
+    Returns:
+        tuple: The statements before its RETURN, without comments, or None if it cannot be inlined.
+    """
+    statements = []
+
+    for line_number in line_numbers[index:index + limit + 1]:
+        statement = program[line_number].statement
+        if type(statement) is classes.ReturnStatement:
+            return tuple(statement for statement in statements if type(statement) is not classes.RemStatement)
+        if type(statement) not in STRAIGHT_LINE_STATEMENTS:
+            return None
+        statements.append(statement)
+
+    return None
+
+def fold_expression(expression):
+    """
+    Fold constant subexpressions and simplify identities such as x + 0 and x * 1
+    where x is provably a number.
+    Args:
+        expression (Expression): The expression to fold.
+    Returns:
+        tuple: The folded expression and the number of nodes folded away.
+    """
+    if isinstance(expression, classes.Element):
+        expression.index, folded = fold_expression(expression.index)
+        return expression, folded
+
+    if isinstance(expression, classes.Chain):
+        return fold_chain(expression)
+
+    if not isinstance(expression, classes.Operation):
+        return expression, 0
+
+    left, left_count = fold_expression(expression.left)
+    right, right_count = fold_expression(expression.right)
+    expression.left = left
+    expression.right = right
+    folded = left_count + right_count
+
+    if is_constant(left) and is_constant(right):
+        try:
+            result = expression.function(left.value, right.value)
+        except (ArithmeticError, TypeError):
+            # Leave the error to be raised when the line runs
+            return expression, folded
+        return constant(result), folded + 1
+
+    if expression.operator in IDENTITIES:
+        identities, types = IDENTITIES[expression.operator]
+        if "right" in identities and is_constant(right, identities["right"]) and numeric_type(left) in types:
+            return left, folded + 1
+        if "left" in identities and is_constant(left, identities["left"]) and numeric_type(right) in types:
+            return right, folded + 1
+
+    return expression, folded
+
+def fold_chain(chain):
+    """
+    Fold the operands of a chain, and the constant operations at its start.
+
+    Only a leading run of constants is folded, since the operations are
+    applied left to right.
+    Returns:
+        tuple: The folded expression and the number of nodes folded away.
+    """
+    folded = 0
+    for index, operand in enumerate(chain.operands):
+        chain.operands[index], count = fold_expression(operand)
+        folded += count
+
+    operands = chain.operands
+    while len(operands) > 1 and is_constant(operands[0]) and is_constant(operands[1]):
+        try:
+            result = chain.functions[0](operands[0].value, operands[1].value)
+        except (ArithmeticError, TypeError):
+            # Leave the error to be raised when the line runs
+            break
+        operands[:2] = [constant(result)]
+        del chain.operators[0]
+        del chain.functions[0]
+        folded += 1
+
+    if len(operands) == 1:
+        return operands[0], folded
+    if len(operands) == 2:
+        operation = classes.TracedOperation if isinstance(chain, classes.TracedChain) else classes.Operation
+        expression, count = fold_expression(operation(chain.operators[0], operands[0], operands[1]))
+        return expression, folded + count
+    return chain, folded
+
+def numeric_type(expression):
+    """
+    Get the numeric type an expression always evaluates to, if it can be known before running.
+
+    Array elements and array functions are floats, as arrays hold doubles.
+    Variables can hold strings, so their type is never known.
+    Returns:
+        type: int or float, or None if the result may not be a number.
+    """
+    if type(expression) is classes.Value:
+        return type(expression.value) if type(expression.value) in (int, float) else None
+    if isinstance(expression, (classes.Element, classes.ArrayFunction)):
+        return float
+    if isinstance(expression, classes.Operation) and expression.operator in ARITHMETIC_OPERATORS:
+        operators = [expression.operator]
+        operands = [expression.left, expression.right]
+    elif isinstance(expression, classes.Chain) and all(operator in ARITHMETIC_OPERATORS for operator in expression.operators):
+        operators = expression.operators
+        operands = expression.operands
+    else:
+        return None
+
+    types = [numeric_type(operand) for operand in operands]
+    if None in types:
+        return None
+    if '/' in operators or float in types:
+        return float
+    return int
+
+def is_constant(expression, value=None):
+    """
+    Check whether an expression is a literal, optionally of a given integer value.
+    """
+    if type(expression) is not classes.Value:
+        return False
+    if value is None:
+        return True
+    return type(expression.value) is int and expression.value == value
+
+def constant(value):
+    """
+    Build a Value node holding value as-is, without literal quote stripping or number parsing.
+    """
+    node = classes.Value(None)
+    node.value = value
+    return node
@@ -0,0 +1,97 @@
+"""
+interpreters/basic/profiler.py
+Line-level profiler for BASIC programs
+"""
+
+import json
+from collections import defaultdict
+
+FORMATS = ["text", "json", "collapsed"]
+
+class Profiler:
+    """
+    A class collecting per-line hit counts and cumulative time of BASIC runs.
+
+    Attributes:
+        hits (dict): Mapping of line numbers to the number of times they ran.
+        times (dict): Mapping of line numbers to their cumulative run time in nanoseconds.
+    """
+
+    def __init__(self):
+        self.hits = defaultdict(int)
+        self.times = defaultdict(int)
+
+    def __repr__(self):
+        return f"Profiler({len(self.hits)} lines)"
+
+    def reset(self):
+        """
+        Discard all collected data.
+        """
+        self.hits.clear()
+        self.times.clear()
+
+    def rows(self, program):
+        """
+        Get the profile of each line that ran, hottest first.
+        Args:
+            program (dict): Mapping of line numbers to Line objects.
+        Returns:
+            list: A dict per line with its number, hits, time in nanoseconds and statement.
+        """
+        rows = [
+            {
+                "line": line_number,
+                "hits": hits,
+                "time_ns": self.times[line_number],
+                "statement": repr(program[line_number].statement) if line_number in program else None,
+            }
+            for line_number, hits in self.hits.items()
+        ]
+        rows.sort(key=lambda row: row["time_ns"], reverse=True)
+        return rows
+
+    def format_text(self, program, limit=20):
+        """
+        Format a report of the hottest lines.
+        Args:
+            program (dict): Mapping of line numbers to Line objects.
+            limit (int): The maximum number of lines to list.
+        Returns:
+            str: The report.
+        """
+        rows = self.rows(program)
+        total = sum(row["time_ns"] for row in rows) or 1
+
+        lines = [f"{'line':>8} {'hits':>10} {'total ms':>10} {'% time':>7} {'ns/hit':>8}  statement"]
+        for row in rows[:limit]:
+            lines.append(
+                f"{row['line']:>8} {row['hits']:>10} {row['time_ns'] / 1e6:>10.3f} "
+                f"{100 * row['time_ns'] / total:>6.1f}% {row['time_ns'] // row['hits']:>8}  {row['statement']}"
+            )
+        return '\n'.join(lines)
+
+    def format_json(self, program):
+        """
+        Format the profile as JSON.
+        """
+        return json.dumps(self.rows(program), indent=4)
+
+    def format_collapsed(self, program):
+        """
+        Format the profile as collapsed stacks for flamegraph tools, weighted by nanoseconds.
+        """
+        return '\n'.join(
+            f"program;line {row['line']} {row['time_ns']}"
+            for row in sorted(self.rows(program), key=lambda row: row["line"])
+        )
+
+    def format(self, program, format="text"):
+        """
+        Format the profile in one of FORMATS.
+        """
+        if format == "json":
+            return self.format_json(program)
+        if format == "collapsed":
+            return self.format_collapsed(program)
+        return self.format_text(program)
@@ -20,41 +20,34 @@ def _safe_echo(*args, **kwargs):
 
 click.echo = _safe_echo
 
+interpreter = BasicInterpreter()
+
 def sigint(signal, frame):
-    global environment
+    global interpreter
     """
     Signal handler for SIGINT (Ctrl+C).
     """
 
+    environment = interpreter.environment
     try:
-        if environment["__running"]:
+        if environment.running:
             click.echo("\nStopping run.")
-            environment["__running"] = False
+            environment.running = False
         else:
             click.echo("\nExit.")
-            environment["__running"] = False
+            environment.running = False
             exit(0)
     except Exception as e:
         click.echo(f"Exception caught!: {e}")
-        environment["__running"] = False
-
-environment = {
-    "__program_counter": 0,
-    "__max_line_number": 0,
-    "__current_line": -1,
-    "__verbose": False,
-    "__running": False
-}
-
-program = {}
+        environment.running = False
 
 def repl(verbose=False):
     """
     Read-Eval-Print Loop (REPL) for BASIC interpreter.
     """
-    global environment
-    global program
+    global interpreter
 
+    interpreter = BasicInterpreter(verbose=verbose)
     signal.signal(signal.SIGINT, sigint)
 
     click.echo("Welcome to the BASIC REPL! Type 'exit' to quit.")
@@ -75,8 +68,9 @@ def command(user_input):
     """
     Execute a command in the REPL.
     """
-    global environment
-    global program
+    global interpreter
+
+    program = interpreter.program
 
     if user_input.lower() == "exit":
         click.echo("Exit.")
@@ -86,74 +80,40 @@ def command(user_input):
         if not program:
             click.echo("No program loaded.")
         else:
-            for line_number in sorted(program.keys()):
-                click.echo(f"{line_number}: {program[line_number]}")
+            for line_number in interpreter.line_numbers:
+                click.echo(program[line_number])
     elif user_input.lower() == "run":
-        environment["__running"] = True
-        environment["__program_counter"] = 0
         run_loop()
     elif user_input.lower() == "new":
-        program.clear()
-        environment["__program_counter"] = 0
-        environment["__current_line"] = -1
-        environment["__max_line_number"] = 0
+        interpreter.clear()
         click.echo("New program created.")
 
+    elif user_input.isdigit():
+        if not interpreter.delete_line(int(user_input)):
+            click.echo(f"No line {user_input}.")
+
     elif user_input.split()[0].isdigit():
-        line_number = int(user_input.split()[0])
-        line = parse_line(user_input)
-        program[line_number] = line
+        try:
+            interpreter.add_line(user_input)
+        except classes.BasicSyntaxError as e:
+            click.echo(e)
 
     else:
         click.echo(f"Unknown command: {user_input}")
 
 def run_loop():
     """
-    Run the BASIC program in a loop.
+    Run the BASIC program until it ends or is interrupted.
     """
-    global environment
-    global program
-
-    click.echo("Running program...")
-
-    program_line_numbers = list(program.keys())
-    environment['__program_counter'] = 0
-    environment['__max_line_number'] = max(program_line_numbers)
-    environment['__current_line'] = -1
+    global interpreter
 
-    while environment['__program_counter'] < environment['__max_line_number']:
+    if not interpreter.program:
+        click.echo("No program loaded.")
+        return
 
-        # Startup
-        if environment['__current_line'] == -1:
-            try:
-                environment['__current_line'] = program_line_numbers[environment['__program_counter']]
-            except IndexError:
-                click.echo("No program loaded.")
-                break
-        else:
-            line_index = program_line_numbers.index(environment['__current_line'])
-            if line_index != environment['__program_counter']:
-                # Means a GOTO has occured
-                environment['__program_counter'] = line_index
-            else:
-                environment['__program_counter'] += 1
-
-        if environment['__program_counter'] >= len(program_line_numbers):
-            break
-        
-        if not environment['__running']: # Ctrl+C
-            break
-
-        environment['__current_line'] = program_line_numbers[environment['__program_counter']]
-
-        if environment['__verbose']:
-            click.echo(f"Executing line {environment['__current_line']}")
-
-        line = program[environment['__current_line']]
-        if environment['__verbose']:
-            click.echo(f"Line: {line}")
-
-        # Execute the line
-        line.execute(environment)
+    click.echo("Running program...")
 
-    environment['__running'] = False
+    try:
+        interpreter.run()
+    except classes.BasicError as e:
+        click.echo(e)
@@ -0,0 +1,280 @@
+"""
+interpreters/basic/streams.py
+Output sinks and input sources for BASIC programs
+"""
+
+import json
+import sys
+
+import click
+
+from interpreters.basic.errors import BasicRuntimeError
+
+class OutputSink:
+    """
+    Base class for destinations of PRINT output.
+    """
+
+    def write(self, value):
+        """
+        Write a value as one line of output.
+        """
+        raise NotImplementedError("Output sinks must implement write.")
+
+    def flush(self):
+        """
+        Push any buffered output to its destination.
+        """
+        pass
+
+class EchoSink(OutputSink):
+    """
+    An output sink that echoes every line immediately through click.
+    
+    Attributes:
+        file (file): The stream to echo to, or None for stdout.
+    """
+
+    def __init__(self, file=None):
+        self.file = file
+
+    def __repr__(self):
+        return f"EchoSink({self.file})"
+
+    def write(self, value):
+        """
+        Echo a line.
+        """
+        click.echo(value, file=self.file)
+
+class BufferedSink(OutputSink):
+    """
+    An output sink that collects lines and writes them to a stream in batches.
+
+    Attributes:
+        stream (file): The stream to write to.
+        buffer_size (int): The number of characters to collect before writing.
+    """
+
+    def __init__(self, stream=None, buffer_size=8192):
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._size = 0
+
+    def __repr__(self):
+        return f"BufferedSink({self.stream}, {self.buffer_size})"
+
+    def write(self, value):
+        """
+        Buffer a line, writing the buffer out once it is full.
+        """
+        text = f"{value}\n"
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write out the buffered lines.
+        """
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer.clear()
+            self._size = 0
+        self.stream.flush()
+
+class MemorySink(OutputSink):
+    """
+    An output sink that keeps all lines in memory, for tests and batch runs.
+
+    Attributes:
+        lines (list): The lines written, without newlines.
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def __repr__(self):
+        return f"MemorySink({len(self.lines)} lines)"
+
+    def write(self, value):
+        """
+        Store a line.
+        """
+        self.lines.append(str(value))
+
+    def getvalue(self):
+        """
+        Get all output as a single string.
+        """
+        return ''.join(f"{line}\n" for line in self.lines)
+
+class InputSource:
+    """
+    Base class for sources of INPUT values.
+
+    Attributes:
+        position (int): The number of values read so far.
+    """
+
+    position = 0
+
+    def read(self, prompt=None):
+        """
+        Read the next input value.
+        Args:
+            prompt (str): The prompt of the INPUT statement, if any.
+        Returns:
+            any: The value. Text is converted to a number by the INPUT statement where possible.
+        Raises:
+            EOFError: If there are no values left.
+        """
+        raise NotImplementedError("Input sources must implement read.")
+
+    def skip(self, count):
+        """
+        Skip values already consumed by an earlier run, as when resuming from a checkpoint.
+        Args:
+            count (int): The number of values to skip.
+        """
+        for _ in range(count):
+            try:
+                self.read()
+            except EOFError:
+                break
+
+class PromptInput(InputSource):
+    """
+    An input source that prompts for each value on the terminal.
+    """
+
+    def __repr__(self):
+        return f"PromptInput()"
+
+    def read(self, prompt=None):
+        """
+        Prompt for a value.
+        """
+        try:
+            value = click.prompt(prompt if prompt else "", type=str)
+        except click.exceptions.Abort:
+            raise EOFError() from None
+        self.position += 1
+        return value
+
+    def skip(self, count):
+        """
+        Count answers given in an earlier session as read; they cannot be replayed.
+        """
+        self.position += count
+
+class StreamInput(InputSource):
+    """
+    An input source that reads one value per line from a stream, such as a file or piped stdin.
+
+    Attributes:
+        stream (file): The stream to read from.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __repr__(self):
+        return f"StreamInput({self.stream})"
+
+    def read(self, prompt=None):
+        """
+        Read the next line.
+        """
+        line = self.stream.readline()
+        if not line:
+            raise EOFError()
+        self.position += 1
+        return line.rstrip("\r\n")
+
+class IteratorInput(InputSource):
+    """
+    An input source that takes values from a Python iterable.
+
+    Attributes:
+        values (iterator): The remaining values.
+    """
+
+    def __init__(self, values):
+        self.values = iter(values)
+
+    def __repr__(self):
+        return f"IteratorInput({self.values})"
+
+    def read(self, prompt=None):
+        """
+        Take the next value.
+        """
+        try:
+            value = next(self.values)
+        except StopIteration:
+            raise EOFError() from None
+        self.position += 1
+        return value
+
+class JSONLInput(InputSource):
+    """
+    An input source that reads one column of a JSONL stream, one value per record.
+
+    Attributes:
+        stream (file): The stream of JSON objects, one per line.
+        column (str): The key to read from each object.
+        line_number (int): The number of lines read from the stream, for error messages.
+    """
+
+    def __init__(self, stream, column):
+        self.stream = stream
+        self.column = column
+        self.line_number = 0
+
+    def __repr__(self):
+        return f"JSONLInput({self.stream}, {self.column})"
+
+    def read(self, prompt=None):
+        """
+        Read the column from the next record, skipping blank lines.
+        Raises:
+            EOFError: If there are no records left.
+            BasicRuntimeError: If the line is not a JSON object with the column.
+        """
+        line = self.stream.readline()
+        self.line_number += 1
+        while line and not line.strip():
+            line = self.stream.readline()
+            self.line_number += 1
+        if not line:
+            raise EOFError()
+
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise BasicRuntimeError(f"Input line {self.line_number} is not valid JSON: {e}") from None
+        if not isinstance(record, dict):
+            raise BasicRuntimeError(f"Input line {self.line_number} is not a JSON object, so it has no column {self.column!r}.")
+        if self.column not in record:
+            raise BasicRuntimeError(f"Input line {self.line_number} has no column {self.column!r}.")
+        self.position += 1
+        return record[self.column]
+
+def as_input(source):
+    """
+    Get an input source for a stream, an iterable or None.
+    Args:
+        source (any): An InputSource, a stream with readline, an iterable of values, or None to prompt on the terminal.
+    Returns:
+        InputSource: The input source.
+    """
+    if source is None:
+        return PromptInput()
+    if isinstance(source, InputSource):
+        return source
+    if hasattr(source, "readline"):
+        return StreamInput(source)
+    return IteratorInput(source)
@@ -0,0 +1,80 @@
+"""
+interpreters/basic/trace.py
+Tracing hooks for BASIC runs
+"""
+
+import click
+import json
+
+class Tracer:
+    """
+    Base class for BASIC run tracers.
+
+    A tracer is chosen once when the interpreter is created; runs without one
+    use dispatch loops that contain no tracing code at all. Each hook does
+    nothing by default, so subclasses only override the events they need.
+    """
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    def start(self, environment, program):
+        """
+        Called once before a run starts.
+        Args:
+            environment (Environment): The interpreter environment.
+            program (dict): Mapping of line numbers to Line objects.
+        """
+
+    def line_enter(self, environment, line):
+        """
+        Called before a line executes.
+        Args:
+            environment (Environment): The interpreter environment.
+            line (Line): The line about to execute.
+        """
+
+    def statement_exec(self, environment, statement):
+        """
+        Called after a statement has executed.
+        Args:
+            environment (Environment): The interpreter environment.
+            statement (Statement): The statement that executed.
+        """
+
+    def assignment(self, environment, name, value):
+        """
+        Called after a statement assigns a variable.
+        Args:
+            environment (Environment): The interpreter environment.
+            name (str): The name of the variable.
+            value: The value assigned.
+        """
+
+    def jump(self, environment, source, target):
+        """
+        Called when control moves to a line other than the next one.
+        Args:
+            environment (Environment): The interpreter environment.
+            source (int): The line number the jump was made from.
+            target (int): The line number jumped to, or None if the program ended.
+        """
+
+class EchoTracer(Tracer):
+    """
+    A tracer echoing each event, used in verbose mode.
+    """
+
+    def start(self, environment, program):
+        click.echo(program)
+        click.echo(json.dumps(environment.snapshot(), indent=4))
+
+    def line_enter(self, environment, line):
+        click.echo(f"Executing line {line.linenum}")
+        click.echo(f"Line: {line}")
+
+    def assignment(self, environment, name, value):
+        click.echo(f"LET {name} = {value}")
+
+    def jump(self, environment, source, target):
+        click.echo(f"GOTO {target}" if target is not None else "END")
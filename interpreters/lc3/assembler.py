@@ -0,0 +1,420 @@
+"""
+interpreters/lc3/assembler.py
+Two-pass LC-3 assembler
+
+The first pass assigns an address to every line and builds the symbol
+table; the second encodes each instruction and directive into 16-bit words.
+"""
+
+import array
+import re
+
+from interpreters.lc3.classes import Image
+from interpreters.lc3.errors import AssemblyError
+
+# Opcodes, by the top four bits of an instruction
+OPCODES = {
+    "BR": 0x0, "ADD": 0x1, "LD": 0x2, "ST": 0x3, "JSR": 0x4, "JSRR": 0x4, "AND": 0x5, "LDR": 0x6,
+    "STR": 0x7, "RTI": 0x8, "NOT": 0x9, "LDI": 0xA, "STI": 0xB, "JMP": 0xC, "RET": 0xC, "LEA": 0xE,
+    "TRAP": 0xF,
+}
+
+# Trap routines with their own mnemonics
+TRAP_ALIASES = {
+    "GETC": 0x20,
+    "OUT": 0x21,
+    "PUTS": 0x22,
+    "IN": 0x23,
+    "PUTSP": 0x24,
+    "HALT": 0x25,
+}
+
+DIRECTIVES = {".ORIG", ".FILL", ".BLKW", ".STRINGZ", ".END"}
+
+# Condition codes of a branch, as the n, z and p bits
+BRANCH_PATTERN = re.compile(r"BR([NZP]*)", re.IGNORECASE)
+
+REGISTER_PATTERN = re.compile(r"R([0-7])", re.IGNORECASE)
+
+# Strings keep their spaces and may contain ';', so they are matched before comments
+TOKEN_PATTERN = re.compile(r"""
+    (?P<space>[\s,]+)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<comment>;.*)
+  | (?P<word>[^\s,;"]+)
+  | (?P<error>.)
+""", re.VERBOSE)
+
+# Numeric literals, with the digits allowed by each base
+NUMBER_PATTERN = re.compile(r"""
+    (?P<sign>-?)
+    (?:
+        \#(?P<decimal_sign>-?)(?P<decimal>[0-9]+)
+      | (?P<plain>[0-9]+)
+      | [xX](?P<hex_sign>-?)(?P<hex>[0-9A-Fa-f]+)
+      | [bB](?P<binary_sign>-?)(?P<binary>[01]+)
+    )
+""", re.VERBOSE)
+
+# Base of each digits group of NUMBER_PATTERN, with the group holding its sign after the prefix
+BASES = {"decimal": (10, "decimal_sign"), "plain": (10, None), "hex": (16, "hex_sign"), "binary": (2, "binary_sign")}
+
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0", "\\": "\\", '"': '"'}
+
+class SourceLine:
+    """
+    A class representing a line of LC-3 assembly after the first pass.
+
+    Attributes:
+        number (int): The line number in the source, for error messages.
+        address (int): The address of the first word of the line.
+        mnemonic (str): The upper-cased opcode or directive.
+        operands (list): The operand tokens.
+    """
+
+    __slots__ = ("number", "address", "mnemonic", "operands")
+
+    def __init__(self, number, address, mnemonic, operands):
+        self.number = number
+        self.address = address
+        self.mnemonic = mnemonic
+        self.operands = operands
+
+    def __repr__(self):
+        return f"SourceLine({self.number}, x{self.address:04X}, {self.mnemonic}, {self.operands})"
+
+def assemble_file(file):
+    """
+    Assemble an LC-3 assembly file.
+    Args:
+        file (str): The path to the assembly file.
+    Returns:
+        Image: The assembled image.
+    """
+    with open(file, 'r') as f:
+        return assemble(f.read())
+
+def assemble(source):
+    """
+    Assemble LC-3 assembly source into a memory image.
+    Args:
+        source (str): The assembly source code.
+    Returns:
+        Image: The machine words from the .ORIG address, with the symbol table of the labels.
+    Raises:
+        AssemblyError: If the source is invalid.
+    """
+    origin, lines, symbols = first_pass(source)
+
+    words = array.array('H')
+    for line in lines:
+        words.extend(encode(line, symbols))
+
+    return Image(origin, words, symbols)
+
+def tokenize(text, number):
+    """
+    Split a line of assembly into tokens, dropping separators and the comment.
+    Args:
+        text (str): The line of assembly.
+        number (int): The line number, for error messages.
+    Returns:
+        list: The tokens.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "string" or kind == "word":
+            tokens.append(match.group())
+        elif kind == "error":
+            error(number, f"Unterminated string {text[match.start():].strip()}")
+    return tokens
+
+def error(number, message):
+    """
+    Raise an AssemblyError for a line.
+    """
+    raise AssemblyError(f"Assembly error: line {number}: {message}")
+
+def is_mnemonic(token):
+    """
+    Check whether a token is an opcode, trap alias or directive.
+    """
+    name = token.upper()
+    return name in OPCODES or name in TRAP_ALIASES or name in DIRECTIVES or BRANCH_PATTERN.fullmatch(name) is not None
+
+def first_pass(source):
+    """
+    Assign addresses to the lines of a program and collect its labels.
+    Args:
+        source (str): The assembly source code.
+    Returns:
+        tuple: The .ORIG address, the SourceLine of each line that emits words, and the symbol table.
+    """
+    origin = None
+    address = None
+    lines = []
+    symbols = {}
+
+    for number, text in enumerate(source.split('\n'), start=1):
+        tokens = tokenize(text, number)
+        if not tokens:
+            continue
+
+        # A leading token that is not a mnemonic is a label
+        if not is_mnemonic(tokens[0]):
+            label = tokens.pop(0).rstrip(':')
+            if origin is None:
+                error(number, f"Label {label} before .ORIG")
+            if label in symbols:
+                error(number, f"Duplicate label {label}")
+            if REGISTER_PATTERN.fullmatch(label) or not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", label):
+                error(number, f"Invalid label {label}")
+            symbols[label] = address
+            if not tokens:
+                continue
+
+        mnemonic = tokens[0].upper()
+        operands = tokens[1:]
+        if not is_mnemonic(mnemonic):
+            error(number, f"Unknown instruction {tokens[0]}")
+
+        if mnemonic == ".ORIG":
+            if origin is not None:
+                error(number, "Duplicate .ORIG")
+            if len(operands) != 1:
+                error(number, ".ORIG takes one address")
+            origin = address = parse_number(operands[0], number, 0, 0xFFFF)
+            continue
+
+        if origin is None:
+            error(number, f"{mnemonic} before .ORIG")
+        if mnemonic == ".END":
+            break
+
+        lines.append(SourceLine(number, address, mnemonic, operands))
+        address += line_size(mnemonic, operands, number)
+        if address > 0x10000:
+            error(number, "Program runs past the end of memory")
+
+    if origin is None:
+        raise AssemblyError("Assembly error: missing .ORIG")
+
+    return origin, lines, symbols
+
+def line_size(mnemonic, operands, number):
+    """
+    Get the number of words a line assembles to.
+    """
+    if mnemonic == ".BLKW":
+        if len(operands) not in (1, 2):
+            error(number, ".BLKW takes a count and an optional fill value")
+        return parse_number(operands[0], number, 0, 0xFFFF)
+    if mnemonic == ".STRINGZ":
+        if len(operands) != 1:
+            error(number, ".STRINGZ takes one string")
+        return len(parse_string(operands[0], number)) + 1
+    return 1
+
+def parse_number(token, number, low, high):
+    """
+    Parse a decimal (#10 or 10), hexadecimal (x1F) or binary (b101) literal and check its range.
+    A minus sign may come before or after the #, x and b prefixes.
+    Args:
+        token (str): The literal.
+        number (int): The line number, for error messages.
+        low (int): The smallest value allowed.
+        high (int): The largest value allowed.
+    Returns:
+        int: The value.
+    Raises:
+        AssemblyError: If the literal is malformed or out of range.
+    """
+    match = NUMBER_PATTERN.fullmatch(token)
+    if match is None:
+        error(number, f"Invalid number {token}")
+
+    group = match.lastgroup
+    base, sign_group = BASES[group]
+    try:
+        value = int(match.group(group), base)
+    except ValueError:
+        error(number, f"Invalid number {token}")
+    if match.group("sign") or (sign_group and match.group(sign_group)):
+        value = -value
+
+    if not low <= value <= high:
+        error(number, f"{token} is out of range {low}..{high}")
+    return value
+
+def is_number(token, symbols=None):
+    """
+    Check whether an operand is a numeric literal rather than a label.
+
+    A defined label always wins, so labels such as FACE or b1 can be used
+    as operands. Tokens that cannot be labels, because they start with a
+    digit, # or -, count as numbers even when malformed, so parse_number
+    reports them.
+    Args:
+        token (str): The operand.
+        symbols (dict): The symbol table, or None before labels are known.
+    Returns:
+        bool: True if the token should be parsed as a number.
+    """
+    if symbols is not None and token in symbols:
+        return False
+    return NUMBER_PATTERN.fullmatch(token) is not None or token[:1] in "#-0123456789"
+
+def parse_string(token, number):
+    """
+    Parse a quoted .STRINGZ literal, resolving backslash escapes.
+    """
+    if len(token) < 2 or token[0] != '"' or token[-1] != '"':
+        error(number, f"Expected a string, not {token}")
+
+    text = token[1:-1]
+    characters = []
+    index = 0
+    while index < len(text):
+        character = text[index]
+        if character == "\\":
+            index += 1
+            if index == len(text) or text[index] not in ESCAPES:
+                error(number, f"Invalid escape in {token}")
+            character = ESCAPES[text[index]]
+        characters.append(character)
+        index += 1
+    return ''.join(characters)
+
+def register(token, number):
+    """
+    Parse a register operand.
+    Returns:
+        int: The register index.
+    """
+    match = REGISTER_PATTERN.fullmatch(token)
+    if match is None:
+        error(number, f"Expected a register, not {token}")
+    return int(match.group(1))
+
+def offset(token, line, symbols, bits):
+    """
+    Parse a PC-relative operand: a label, or a literal offset.
+    Args:
+        token (str): The operand.
+        line (SourceLine): The line being encoded.
+        symbols (dict): The symbol table.
+        bits (int): The width of the offset field.
+    Returns:
+        int: The offset, masked to the field width.
+    """
+    low, high = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+    if is_number(token, symbols):
+        value = parse_number(token, line.number, low, high)
+    elif token in symbols:
+        value = symbols[token] - (line.address + 1)
+        if not low <= value <= high:
+            error(line.number, f"Label {token} is too far away for a {bits}-bit offset")
+    else:
+        error(line.number, f"Undefined label {token}")
+
+    return value & ((1 << bits) - 1)
+
+def immediate(token, line, bits):
+    """
+    Parse a signed immediate operand, masked to the field width.
+    """
+    return parse_number(token, line.number, -(1 << (bits - 1)), (1 << (bits - 1)) - 1) & ((1 << bits) - 1)
+
+def expect_operands(line, count):
+    """
+    Check the number of operands of a line.
+    """
+    if len(line.operands) != count:
+        error(line.number, f"{line.mnemonic} takes {count} operand{'s' if count != 1 else ''}")
+
+def encode(line, symbols):
+    """
+    Encode a line into machine words.
+    Args:
+        line (SourceLine): The line to encode.
+        symbols (dict): The symbol table.
+    Returns:
+        list: The words of the line.
+    """
+    mnemonic = line.mnemonic
+    operands = line.operands
+    number = line.number
+
+    # Directives
+    if mnemonic == ".FILL":
+        expect_operands(line, 1)
+        token = operands[0]
+        if is_number(token, symbols):
+            return [parse_number(token, number, -0x8000, 0xFFFF) & 0xFFFF]
+        if token in symbols:
+            return [symbols[token]]
+        error(number, f"Undefined label {token}")
+    if mnemonic == ".BLKW":
+        fill = parse_number(operands[1], number, -0x8000, 0xFFFF) & 0xFFFF if len(operands) == 2 else 0
+        return [fill] * parse_number(operands[0], number, 0, 0xFFFF)
+    if mnemonic == ".STRINGZ":
+        text = parse_string(operands[0], number)
+        if any(ord(character) > 0xFFFF for character in text):
+            error(number, "String characters must fit in 16 bits")
+        return [ord(character) for character in text] + [0]
+
+    # Traps
+    if mnemonic in TRAP_ALIASES:
+        expect_operands(line, 0)
+        return [0xF000 | TRAP_ALIASES[mnemonic]]
+    if mnemonic == "TRAP":
+        expect_operands(line, 1)
+        return [0xF000 | parse_number(operands[0], number, 0, 0xFF)]
+
+    branch = BRANCH_PATTERN.fullmatch(mnemonic)
+    if branch is not None:
+        expect_operands(line, 1)
+        flags = branch.group(1) or "NZP"
+        condition = ("N" in flags) << 2 | ("Z" in flags) << 1 | ("P" in flags)
+        return [condition << 9 | offset(operands[0], line, symbols, 9)]
+
+    opcode = OPCODES[mnemonic] << 12
+
+    if mnemonic in ("ADD", "AND"):
+        expect_operands(line, 3)
+        destination = register(operands[0], number)
+        source = register(operands[1], number)
+        if REGISTER_PATTERN.fullmatch(operands[2]):
+            return [opcode | destination << 9 | source << 6 | register(operands[2], number)]
+        return [opcode | destination << 9 | source << 6 | 0x20 | immediate(operands[2], line, 5)]
+
+    if mnemonic == "NOT":
+        expect_operands(line, 2)
+        return [opcode | register(operands[0], number) << 9 | register(operands[1], number) << 6 | 0x3F]
+
+    if mnemonic in ("LD", "ST", "LDI", "STI", "LEA"):
+        expect_operands(line, 2)
+        return [opcode | register(operands[0], number) << 9 | offset(operands[1], line, symbols, 9)]
+
+    if mnemonic in ("LDR", "STR"):
+        expect_operands(line, 3)
+        base = register(operands[1], number)
+        return [opcode | register(operands[0], number) << 9 | base << 6 | immediate(operands[2], line, 6)]
+
+    if mnemonic == "JSR":
+        expect_operands(line, 1)
+        return [opcode | 0x0800 | offset(operands[0], line, symbols, 11)]
+
+    if mnemonic in ("JSRR", "JMP"):
+        expect_operands(line, 1)
+        return [opcode | register(operands[0], number) << 6]
+
+    if mnemonic == "RET":
+        expect_operands(line, 0)
+        return [opcode | 7 << 6]
+
+    # RTI
+    expect_operands(line, 0)
+    return [opcode]
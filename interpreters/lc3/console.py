@@ -0,0 +1,159 @@
+"""
+interpreters/lc3/console.py
+Console output and keyboard input for LC-3 programs
+"""
+
+import sys
+
+import click
+
+class InputSource:
+    """
+    Base class for sources of keyboard characters.
+    """
+
+    def read_char(self):
+        """
+        Read the next character.
+        Returns:
+            str: A single character.
+        Raises:
+            EOFError: If there are no characters left.
+        """
+        raise NotImplementedError("Input sources must implement read_char.")
+
+class TerminalInput(InputSource):
+    """
+    An input source that reads single key presses from the terminal, without echo.
+    """
+
+    def __repr__(self):
+        return f"TerminalInput()"
+
+    def read_char(self):
+        """
+        Wait for a key press.
+        """
+        char = click.getchar(echo=False)
+        # Ctrl+C and Ctrl+D arrive as characters in raw mode
+        if char == "\x03":
+            raise KeyboardInterrupt()
+        if char == "\x04":
+            raise EOFError()
+        return char
+
+class StreamInput(InputSource):
+    """
+    An input source that reads characters from a stream, such as a file or piped stdin.
+
+    Attributes:
+        stream (file): The stream to read from.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __repr__(self):
+        return f"StreamInput({self.stream})"
+
+    def read_char(self):
+        """
+        Read the next character of the stream.
+        """
+        char = self.stream.read(1)
+        if not char:
+            raise EOFError()
+        return char
+
+class IteratorInput(InputSource):
+    """
+    An input source that takes characters from a string or other iterable.
+
+    Attributes:
+        chars (iterator): The remaining characters.
+    """
+
+    def __init__(self, chars):
+        self.chars = iter(chars)
+
+    def __repr__(self):
+        return f"IteratorInput({self.chars})"
+
+    def read_char(self):
+        """
+        Take the next character.
+        """
+        try:
+            return next(self.chars)
+        except StopIteration:
+            raise EOFError() from None
+
+def as_input(source):
+    """
+    Get an input source for a stream, a string or None.
+    Args:
+        source (any): An InputSource, a stream with read, an iterable of characters, or None for stdin.
+    Returns:
+        InputSource: The input source. Stdin is read key by key when it is a terminal.
+    """
+    if isinstance(source, InputSource):
+        return source
+    if source is None:
+        return TerminalInput() if sys.stdin.isatty() else StreamInput(sys.stdin)
+    if hasattr(source, "read"):
+        return StreamInput(source)
+    return IteratorInput(source)
+
+class Console:
+    """
+    A class buffering the output of an LC-3 program and supplying its input.
+
+    Output is collected and written in batches rather than per character. The
+    buffer is flushed when full, and by the traps that wait for input or stop
+    the machine, so prompts are always visible before a program blocks.
+
+    Attributes:
+        input (InputSource): The source of keyboard characters.
+        stream (file): The stream to write output to.
+        buffer_size (int): The number of characters to collect before writing; 0 writes immediately.
+    """
+
+    def __init__(self, input=None, stream=None, buffer_size=8192):
+        self.input = as_input(input)
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._size = 0
+
+    def __repr__(self):
+        return f"Console({self.input}, {self.stream}, {self.buffer_size})"
+
+    def write(self, text):
+        """
+        Buffer text, writing the buffer out once it is full.
+        """
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write out the buffered text.
+        """
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer.clear()
+            self._size = 0
+        self.stream.flush()
+
+    def read_char(self):
+        """
+        Flush pending output and read a character.
+        Returns:
+            str: A single character.
+        Raises:
+            EOFError: If there are no characters left.
+        """
+        self.flush()
+        return self.input.read_char()
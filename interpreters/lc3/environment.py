@@ -3,145 +3,148 @@ interpreters/lc3/environment.py
 LC-3 interpreter environment
 """
 
-import click
+import array
 
 import interpreters.lc3.trap as trap
+from interpreters.lc3.console import Console
+from interpreters.lc3.errors import LC3RuntimeError
 
-program_counter = 0
-program_start = 0
+MEMORY_SIZE = 0x10000
 
-memory = [None] * 65536
-registers = [0] * 8
-flags = {
-    "N": 0,
-    "Z": 0,
-    "P": 0
-}
+# Condition codes, packed in one value with the same bit layout as the nzp field of BR
+FLAG_N = 0b100
+FLAG_Z = 0b010
+FLAG_P = 0b001
 
-def reset_environment():
-    """
-    Reset the LC-3 environment to its initial state.
-    """
-    global program_counter
-    global memory
-    global registers
-    global flags
-
-    program_counter = 0
-    memory = [None] * 65536
-    registers = [0] * 8
-    flags = {
-        "N": 0,
-        "Z": 0,
-        "P": 0
-    }
-
-def pc_increment():
-    """
-    Increment the program counter.
-    """
-    global program_counter
-    program_counter = (program_counter + 1) % 65536
+FLAGS = {"N": FLAG_N, "Z": FLAG_Z, "P": FLAG_P}
 
-def set_flag(flag, value):
-    """
-    Set a flag in the flags dictionary.
-    
-    Args:
-        flag (str): The flag to set ('N', 'Z', or 'P').
-        value (int): The value to set the flag to (0 or 1).
+class Machine:
     """
-    global flags
-    if flag in flags:
-        flags[flag] = value
-    else:
-        raise ValueError(f"Invalid flag: {flag}")
+    A class holding the memory, registers and condition code of an LC-3 machine.
 
-def get_flag(flag):
-    """
-    Get the value of a flag in the flags dictionary.
-    
-    Args:
-        flag (str): The flag to get ('N', 'Z', or 'P').
-        
-    Returns:
-        int: The value of the flag (0 or 1).
-    """
-    global flags
-    if flag in flags:
-        return flags[flag]
-    else:
-        raise ValueError(f"Invalid flag: {flag}")
+    Memory is a preallocated array('H') of 16-bit words and the registers a
+    fixed list of eight unsigned 16-bit values, so the run loop indexes them
+    directly without bounds checks or global lookups.
 
-def set_register(index, value):
-    """
-    Set a value in the registers list.
-    
-    Args:
-        index (int): The index of the register (0-7).
-        value (int): The value to set the register to.
+    Attributes:
+        memory (array): The 65536 words of memory.
+        registers (list): The values of R0 to R7.
+        condition (int): The packed N, Z and P condition code, one of FLAG_N, FLAG_Z or FLAG_P.
+        program_counter (int): The address of the next instruction.
+        program_start (int): The address the loaded program starts at.
+        running (bool): Whether the machine is running. Cleared to stop a run early.
+        console (Console): The console the trap routines read from and write to.
     """
-    global registers
-    if 0 <= index < len(registers):
-        registers[index] = value
-    else:
-        raise ValueError(f"Invalid register index: {index}")
 
-def get_register(index):
-    """
-    Get the value of a register in the registers list.
-    
-    Args:
-        index (int): The index of the register (0-7).
-        
-    Returns:
-        int: The value of the register.
-    """
-    global registers
-    if 0 <= index < len(registers):
-        return registers[index]
-    else:
-        raise ValueError(f"Invalid register index: {index}")
+    __slots__ = ("memory", "registers", "condition", "program_counter", "program_start", "running", "console")
 
-def set_memory(address, value):
-    """
-    Set a value in the memory list.
-    
-    Args:
-        address (int): The address in memory (0-65535).
-        value (int): The value to set the memory location to.
-    """
-    global memory
-    if 0 <= address < len(memory):
-        memory[address] = value
-    else:
-        raise ValueError(f"Invalid memory address: {address}")
+    def __init__(self, console=None):
+        self.memory = array.array('H', bytes(2 * MEMORY_SIZE))
+        self.registers = [0] * 8
+        self.condition = FLAG_Z
+        self.program_counter = 0
+        self.program_start = 0
+        self.running = False
+        self.console = console if console is not None else Console()
 
-def get_memory(address):
-    """
-    Get the value of a memory location in the memory list.
-    
-    Args:
-        address (int): The address in memory (0-65535).
-        
-    Returns:
-        int: The value at the memory location.
-    """
-    global memory
-    if 0 <= address < len(memory):
-        return memory[address]
-    else:
-        raise ValueError(f"Invalid memory address: {address}")
+    def __repr__(self):
+        flags = ''.join(name for name, flag in FLAGS.items() if self.condition & flag)
+        registers = ' '.join(f"R{index}=x{value:04X}" for index, value in enumerate(self.registers))
+        return f"Machine(PC=x{self.program_counter:04X} {registers} CC={flags})"
 
+    def reset(self):
+        """
+        Clear the memory and registers.
+        """
+        # Cleared in place, since decoded programs may hold on to the arrays
+        self.memory[:] = array.array('H', bytes(2 * MEMORY_SIZE))
+        self.registers[:] = [0] * 8
+        self.condition = FLAG_Z
+        self.program_counter = 0
+        self.program_start = 0
+        self.running = False
 
-def execute_trap(trap_vector):
-    """
-    Execute a trap function based on the given trap vector.
-    
-    Args:
-        trap_vector (int): The trap vector to execute.
-    """
-    if trap_vector in trap.trap_table:
-        trap.trap_table[trap_vector]()
-    else:
-        raise ValueError(f"Invalid trap vector: {trap_vector}")
+    def load(self, image):
+        """
+        Copy an assembled image into memory and point the program counter at its origin.
+        Args:
+            image (Image): The assembled program.
+        """
+        end = image.origin + len(image.words)
+        if end > MEMORY_SIZE:
+            raise LC3RuntimeError(f"Image at x{image.origin:04X} does not fit in memory.")
+
+        self.memory[image.origin:end] = image.words
+        self.program_counter = image.origin
+        self.program_start = image.origin
+
+    def set_condition(self, value):
+        """
+        Set the condition code from a 16-bit result.
+        """
+        if value == 0:
+            self.condition = FLAG_Z
+        elif value & 0x8000:
+            self.condition = FLAG_N
+        else:
+            self.condition = FLAG_P
+
+    def get_flag(self, flag):
+        """
+        Get a condition flag.
+        Args:
+            flag (str): The flag to get ('N', 'Z', or 'P').
+        Returns:
+            int: 1 if the flag is set, else 0.
+        """
+        if flag not in FLAGS:
+            raise ValueError(f"Invalid flag: {flag}")
+        return 1 if self.condition & FLAGS[flag] else 0
+
+    def set_register(self, index, value):
+        """
+        Set a register, truncating the value to 16 bits.
+        Args:
+            index (int): The index of the register (0-7).
+            value (int): The value to set the register to.
+        """
+        self.registers[index] = value & 0xFFFF
+
+    def get_register(self, index):
+        """
+        Get the value of a register.
+        Args:
+            index (int): The index of the register (0-7).
+        Returns:
+            int: The value of the register.
+        """
+        return self.registers[index]
+
+    def set_memory(self, address, value):
+        """
+        Set a word of memory, truncating the value to 16 bits.
+        Args:
+            address (int): The address in memory (0-65535).
+            value (int): The value to set the memory location to.
+        """
+        self.memory[address & 0xFFFF] = value & 0xFFFF
+
+    def get_memory(self, address):
+        """
+        Get a word of memory.
+        Args:
+            address (int): The address in memory (0-65535).
+        Returns:
+            int: The value at the memory location.
+        """
+        return self.memory[address & 0xFFFF]
+
+    def execute_trap(self, trap_vector):
+        """
+        Execute a trap routine.
+        Args:
+            trap_vector (int): The trap vector to execute.
+        """
+        if trap_vector not in trap.trap_table:
+            raise LC3RuntimeError(f"Invalid trap vector: x{trap_vector:02X}")
+        trap.trap_table[trap_vector](self)
@@ -0,0 +1,29 @@
+"""
+interpreters/lc3/errors.py
+LC-3 interpreter errors
+"""
+
+class LC3Error(Exception):
+    """
+    Base class for errors reported by LC-3 programs.
+    """
+
+class AssemblyError(LC3Error, ValueError):
+    """
+    An error in the source of an LC-3 program.
+    """
+
+class Halt(Exception):
+    """
+    Raised by the HALT trap to leave the run loop. Not an error.
+    """
+
+class LC3RuntimeError(LC3Error):
+    """
+    An error raised while running an LC-3 program.
+    """
+
+class ObjectFileError(LC3Error, ValueError):
+    """
+    An error in an LC-3 object file.
+    """
@@ -0,0 +1,90 @@
+"""
+interpreters/lc3/loader.py
+LC-3 object file loader
+
+An object file is a sequence of big-endian 16-bit words: the origin,
+followed by the words to load from that address.
+"""
+
+import array
+import mmap
+import sys
+
+from interpreters.lc3.classes import Image
+from interpreters.lc3.environment import MEMORY_SIZE
+from interpreters.lc3.errors import ObjectFileError
+
+OBJECT_EXTENSIONS = (".obj",)
+
+# Bytes of a file read to tell object files from assembly source
+SNIFF_SIZE = 512
+
+def is_object_file(file):
+    """
+    Check whether a file is an object file rather than assembly source.
+
+    Files ending in .obj are object files. Any other file is one if its first
+    bytes contain a NUL, which never appears in source text but does in almost
+    every object file, such as in the low byte of an x3000 origin.
+    Args:
+        file (str): The path to the file.
+    Returns:
+        bool: True if the file should be loaded as an object file.
+    """
+    if file.lower().endswith(OBJECT_EXTENSIONS):
+        return True
+
+    with open(file, 'rb') as f:
+        return b"\0" in f.read(SNIFF_SIZE)
+
+def load_file(file):
+    """
+    Load an LC-3 object file.
+
+    The file is memory-mapped and its words copied into an array('H') in one
+    operation, then byte-swapped in place on little-endian hosts, so loading
+    costs two passes in C rather than a Python loop per word.
+    Args:
+        file (str): The path to the object file.
+    Returns:
+        Image: The words of the file, at the origin given by its first word.
+    Raises:
+        ObjectFileError: If the file is empty, has an odd length or does not fit in memory.
+    """
+    with open(file, 'rb') as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            # mmap cannot map an empty file
+            raise ObjectFileError(f"{file}: Empty object file.")
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return load(view, file)
+
+def load(data, name="<object>"):
+    """
+    Load an LC-3 object file from bytes.
+    Args:
+        data (bytes-like): The contents of the object file.
+        name (str): The name to report errors against.
+    Returns:
+        Image: The words of the file, at the origin given by its first word.
+    Raises:
+        ObjectFileError: If the data is empty, has an odd length or does not fit in memory.
+    """
+    if len(data) < 2:
+        raise ObjectFileError(f"{name}: Missing origin.")
+    if len(data) % 2:
+        raise ObjectFileError(f"{name}: Object file has an odd number of bytes.")
+
+    origin = int.from_bytes(data[:2], "big")
+
+    words = array.array('H')
+    words.frombytes(data[2:])
+    if sys.byteorder == "little":
+        words.byteswap()
+
+    if origin + len(words) > MEMORY_SIZE:
+        raise ObjectFileError(f"{name}: {len(words)} words at x{origin:04X} do not fit in memory.")
+
+    return Image(origin, words)
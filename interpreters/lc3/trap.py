@@ -1,51 +1,99 @@
 """
 interpreters/lc3/trap.py
 LC-3 trap functions
+
+Each routine takes the machine and talks to its console. Strings are
+sliced out of memory in one operation up to their terminator rather than
+read and printed a character at a time.
 """
 
-import click
+import sys
+
+from interpreters.lc3.errors import Halt, LC3RuntimeError
+
+IN_PROMPT = "\nInput a character> "
 
-def trap_GETC():
-    pass
+def read_char(machine):
+    """
+    Read a character from the console into the low byte of R0, clearing the high byte.
+    Returns:
+        str: The character read.
+    """
+    try:
+        char = machine.console.read_char()
+    except EOFError:
+        raise LC3RuntimeError("Ran out of input characters.") from None
 
-def trap_OUT():
-    pass
+    machine.registers[0] = ord(char) & 0xFF
+    return char
 
-def trap_PUTS():
+def string_end(memory, address):
     """
-    Print a string to the console.
-    
-    The string is expected to be null-terminated.
+    Find the address of the null word ending a string, or the end of memory if there is none.
     """
-    # Read the address of the string from R0
-    address = registers[0]
-    
-    # Read characters until we hit a null terminator
-    while True:
-        char = memory[address]
-        if char == 0:
-            break
-        click.echo(char, nl=False)
-        address += 1
+    try:
+        return memory.index(0, address)
+    except ValueError:
+        return len(memory)
 
-def trap_IN():
+def trap_GETC(machine):
     """
-    Read a character from the keyboard and echo it to the console.
+    Read a character from the keyboard into R0, without echo.
     """
-    # Read a character from the keyboard
-    char = click.prompt("", type=str, default='', show_default=False, prompt_suffix='')
-    
-    # Store the character in R0
-    registers[0] = ord(char[0]) if char else 0
-    
-    # Echo the character to the console
-    click.echo(char, nl=False)
+    read_char(machine)
 
-def trap_PUTSP():
-    pass
+def trap_OUT(machine):
+    """
+    Write the character in the low byte of R0 to the console.
+    """
+    machine.console.write(chr(machine.registers[0] & 0xFF))
+
+def trap_PUTS(machine):
+    """
+    Write the string starting at the address in R0 to the console.
+
+    The string holds one character per word and ends with a null word.
+    """
+    memory = machine.memory
+    address = machine.registers[0]
+    end = string_end(memory, address)
+    machine.console.write(''.join(map(chr, memory[address:end])))
 
-def trap_HALT():
-    pass
+def trap_IN(machine):
+    """
+    Prompt for a character, read it into R0 and echo it to the console.
+    """
+    machine.console.write(IN_PROMPT)
+    char = read_char(machine)
+    machine.console.write(char)
+
+def trap_PUTSP(machine):
+    """
+    Write the packed string starting at the address in R0 to the console.
+
+    The string holds two characters per word, low byte first, and ends with a
+    null word. A string of odd length has a zero high byte in its last word.
+    """
+    memory = machine.memory
+    address = machine.registers[0]
+    words = memory[address:string_end(memory, address)]
+    if sys.byteorder == "big":
+        words.byteswap()
+
+    # Little-endian bytes are the characters in order
+    text = words.tobytes().decode("latin-1")
+    if text.endswith("\0"):
+        text = text[:-1]
+    machine.console.write(text)
+
+def trap_HALT(machine):
+    """
+    Flush the console and stop the machine.
+    Raises:
+        Halt: Always, to leave the run loop.
+    """
+    machine.console.flush()
+    raise Halt()
 
 trap_table = {
     0x20: trap_GETC,
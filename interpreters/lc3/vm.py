@@ -0,0 +1,324 @@
+"""
+interpreters/lc3/vm.py
+Fetch/decode/execute loop for LC-3 machine code
+
+Each word is decoded once into a closure specialized for its operands,
+with PC-relative addresses resolved, and cached per address. A closure
+takes the address it runs at and returns the address of the next
+instruction, so the run loop is a single indexed call per instruction.
+Stores reset the cache entry of the address they write.
+"""
+
+import time
+
+from interpreters.lc3.environment import MEMORY_SIZE, FLAG_N, FLAG_Z, FLAG_P
+from interpreters.lc3.errors import Halt, LC3RuntimeError
+
+# Instructions executed between checks for a cleared running flag or an exceeded limit
+RUN_CHUNK = 10_000
+
+# Condition code of every 16-bit result, so instructions set it with one lookup
+CONDITIONS = bytes(
+    FLAG_Z if value == 0 else FLAG_N if value & 0x8000 else FLAG_P
+    for value in range(MEMORY_SIZE)
+)
+
+def sign_extend(value, bits):
+    """
+    Sign-extend a field of the given width to an unsigned 16-bit value.
+    """
+    if value & (1 << (bits - 1)):
+        value -= 1 << bits
+    return value & 0xFFFF
+
+class VM:
+    """
+    A class executing machine code in the memory of an LC-3 machine.
+
+    Attributes:
+        machine (Machine): The machine to run.
+        decoded (list): The decoded instruction of every address, or the decoder for addresses not decoded yet.
+        steps (int): The number of instructions executed.
+    """
+
+    def __init__(self, machine):
+        self.machine = machine
+        self.decoded = [self._decode_at] * MEMORY_SIZE
+        self.steps = 0
+
+    def __repr__(self):
+        return f"VM({self.machine}, {self.steps} steps)"
+
+    def load(self, image):
+        """
+        Load an assembled image into memory, dropping any instructions decoded from the old contents.
+        Args:
+            image (Image): The assembled program.
+        """
+        self.machine.load(image)
+        self.invalidate(image.origin, image.origin + len(image.words))
+
+    def write(self, address, value):
+        """
+        Write a word of memory from outside the program, such as from a debugger or trap routine.
+        """
+        self.machine.set_memory(address, value)
+        self.decoded[address & 0xFFFF] = self._decode_at
+
+    def invalidate(self, start=0, end=MEMORY_SIZE):
+        """
+        Drop the decoded instructions of an address range.
+        """
+        self.decoded[start:end] = [self._decode_at] * (end - start)
+
+    def run(self, max_steps=None, max_time=None):
+        """
+        Run from the program counter until HALT, the running flag is cleared or a limit is exceeded.
+
+        Limits are checked every RUN_CHUNK instructions.
+        Args:
+            max_steps (int): The maximum number of instructions to execute, or None for no limit.
+            max_time (float): The maximum wall-clock time in seconds, or None for no limit.
+        Returns:
+            bool: True if the program halted.
+        """
+        machine = self.machine
+        decoded = self.decoded
+        deadline = time.perf_counter() + max_time if max_time is not None else None
+        last_step = self.steps + max_steps if max_steps is not None else None
+
+        pc = machine.program_counter
+        machine.running = True
+        halted = False
+
+        try:
+            while machine.running:
+                count = RUN_CHUNK
+                if last_step is not None:
+                    count = min(count, last_step - self.steps)
+                    if count <= 0:
+                        break
+
+                executed = 0
+                try:
+                    for executed in range(count):
+                        pc = decoded[pc](pc)
+                except Halt:
+                    self.steps += executed + 1
+                    pc = (pc + 1) & 0xFFFF
+                    halted = True
+                    break
+                except BaseException:
+                    # pc is still the address of the failing instruction
+                    self.steps += executed
+                    raise
+                self.steps += count
+
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+        finally:
+            machine.program_counter = pc
+            machine.running = False
+
+        return halted
+
+    def step(self):
+        """
+        Execute the instruction at the program counter.
+        Returns:
+            bool: True if the instruction halted the machine.
+        """
+        machine = self.machine
+        pc = machine.program_counter
+        try:
+            machine.program_counter = self.decoded[pc](pc)
+        except Halt:
+            machine.program_counter = (pc + 1) & 0xFFFF
+            return True
+        finally:
+            self.steps += 1
+        return False
+
+    def _decode_at(self, pc):
+        """
+        Decode the word at pc into the cache, then execute it.
+        """
+        instruction = self.decoded[pc] = self.decode(self.machine.memory[pc], pc)
+        return instruction(pc)
+
+    def decode(self, word, pc):
+        """
+        Decode a word into a function executing it at pc.
+        Args:
+            word (int): The machine word.
+            pc (int): The address of the word.
+        Returns:
+            function: A function of the address, returning the address of the next instruction.
+        """
+        machine = self.machine
+        registers = machine.registers
+        memory = machine.memory
+        decoded = self.decoded
+        decode_at = self._decode_at
+        conditions = CONDITIONS
+
+        opcode = word >> 12
+        destination = (word >> 9) & 0x7
+        source = (word >> 6) & 0x7
+        next_pc = (pc + 1) & 0xFFFF
+        target = (next_pc + sign_extend(word & 0x1FF, 9)) & 0xFFFF
+
+        if opcode == 0x0: # BR
+            flags = destination
+            if flags == 0:
+                return lambda pc: next_pc
+            if flags == 0x7:
+                return lambda pc: target
+
+            def branch(pc):
+                if machine.condition & flags:
+                    return target
+                return next_pc
+
+            return branch
+
+        if opcode == 0x1 or opcode == 0x5: # ADD, AND
+            if word & 0x20:
+                immediate = sign_extend(word & 0x1F, 5)
+                if opcode == 0x1:
+                    def add_immediate(pc):
+                        value = registers[destination] = (registers[source] + immediate) & 0xFFFF
+                        machine.condition = conditions[value]
+                        return next_pc
+
+                    return add_immediate
+
+                def and_immediate(pc):
+                    value = registers[destination] = registers[source] & immediate
+                    machine.condition = conditions[value]
+                    return next_pc
+
+                return and_immediate
+
+            operand = word & 0x7
+            if opcode == 0x1:
+                def add(pc):
+                    value = registers[destination] = (registers[source] + registers[operand]) & 0xFFFF
+                    machine.condition = conditions[value]
+                    return next_pc
+
+                return add
+
+            def and_(pc):
+                value = registers[destination] = registers[source] & registers[operand]
+                machine.condition = conditions[value]
+                return next_pc
+
+            return and_
+
+        if opcode == 0x2: # LD
+            def load(pc):
+                value = registers[destination] = memory[target]
+                machine.condition = conditions[value]
+                return next_pc
+
+            return load
+
+        if opcode == 0xA: # LDI
+            def load_indirect(pc):
+                value = registers[destination] = memory[memory[target]]
+                machine.condition = conditions[value]
+                return next_pc
+
+            return load_indirect
+
+        if opcode == 0x6: # LDR
+            offset = sign_extend(word & 0x3F, 6)
+
+            def load_register(pc):
+                value = registers[destination] = memory[(registers[source] + offset) & 0xFFFF]
+                machine.condition = conditions[value]
+                return next_pc
+
+            return load_register
+
+        if opcode == 0xE: # LEA
+            def load_effective_address(pc):
+                registers[destination] = target
+                return next_pc
+
+            return load_effective_address
+
+        if opcode == 0x3: # ST
+            def store(pc):
+                memory[target] = registers[destination]
+                decoded[target] = decode_at
+                return next_pc
+
+            return store
+
+        if opcode == 0xB: # STI
+            def store_indirect(pc):
+                address = memory[target]
+                memory[address] = registers[destination]
+                decoded[address] = decode_at
+                return next_pc
+
+            return store_indirect
+
+        if opcode == 0x7: # STR
+            offset = sign_extend(word & 0x3F, 6)
+
+            def store_register(pc):
+                address = (registers[source] + offset) & 0xFFFF
+                memory[address] = registers[destination]
+                decoded[address] = decode_at
+                return next_pc
+
+            return store_register
+
+        if opcode == 0x9: # NOT
+            def not_(pc):
+                value = registers[destination] = registers[source] ^ 0xFFFF
+                machine.condition = conditions[value]
+                return next_pc
+
+            return not_
+
+        if opcode == 0xC: # JMP, RET
+            return lambda pc: registers[source]
+
+        if opcode == 0x4: # JSR, JSRR
+            if word & 0x800:
+                subroutine = (next_pc + sign_extend(word & 0x7FF, 11)) & 0xFFFF
+
+                def jump_subroutine(pc):
+                    registers[7] = next_pc
+                    return subroutine
+
+                return jump_subroutine
+
+            def jump_subroutine_register(pc):
+                subroutine = registers[source]
+                registers[7] = next_pc
+                return subroutine
+
+            return jump_subroutine_register
+
+        if opcode == 0xF: # TRAP
+            vector = word & 0xFF
+
+            def trap(pc):
+                registers[7] = next_pc
+                machine.program_counter = next_pc
+                machine.execute_trap(vector)
+                return next_pc
+
+            return trap
+
+        def illegal(pc):
+            if opcode == 0x8:
+                raise LC3RuntimeError(f"RTI at x{pc:04X} outside supervisor mode.")
+            raise LC3RuntimeError(f"Illegal instruction x{word:04X} at x{pc:04X}.")
+
+        return illegal
@@ -5,12 +5,16 @@ Entry point for the interpreters module.
 """
 
 import click
+import json
 
-from interpreters.basic import run as run_basic
+from interpreters.basic import run as run_basic, ENGINES as BASIC_ENGINES
 from interpreters.lisp import run as run_lisp
 from interpreters.lc3 import run as run_lc3
 
 from interpreters.basic.repl import repl as run_basic_repl
+from interpreters.basic.profiler import FORMATS as BASIC_PROFILE_FORMATS
+from interpreters.basic.streams import StreamInput as BasicStreamInput, JSONLInput as BasicJSONLInput
+from interpreters.basic.batch import read_manifest as read_basic_manifest, run_batch as run_basic_batch
 
 @click.group()
 def interpreters():
@@ -19,12 +23,51 @@ def interpreters():
 @interpreters.command()
 @click.option("--file", "-f", "filename", required=False, type=click.Path(exists=True), help="Path to the BASIC file")
 @click.option("--verbose", is_flag=True, help="Enable verbose output")
-def basic(filename, verbose):
+@click.option("--engine", type=click.Choice(BASIC_ENGINES), default="tree", help="Execution engine for BASIC files")
+@click.option("-O", "optimize", is_flag=True, help="Fold constant expressions before running")
+@click.option("--no-cache", is_flag=True, help="Do not read or write the parsed program cache")
+@click.option("--buffer-size", type=click.IntRange(min=0), default=8192, help="Characters of PRINT output to buffer; 0 writes every line immediately")
+@click.option("--input-file", type=click.File("r"), default=None, help="Read INPUT values from a file, one per line ('-' for stdin)")
+@click.option("--input-column", default=None, help="Read --input-file as JSONL and take INPUT values from this column")
+@click.option("--max-steps", type=click.IntRange(min=0), default=None, help="Stop after executing this many lines")
+@click.option("--max-time", type=click.FloatRange(min=0), default=None, help="Stop after running for this many seconds")
+@click.option("--profile", type=click.Choice(BASIC_PROFILE_FORMATS), is_flag=False, flag_value="text", default=None, help="Profile lines and report as text (default), json or collapsed stacks")
+@click.option("--profile-output", type=click.File("w"), default=None, help="File to write the profile to (default: stderr)")
+@click.option("--checkpoint", "checkpoint_file", type=click.Path(dir_okay=False), default=None, help="Save the run state here if it stops before finishing (limit, SIGTERM or Ctrl+C)")
+@click.option("--resume", type=click.Path(exists=True, dir_okay=False), default=None, help="Continue the run from a checkpoint of the same file")
+def basic(filename, verbose, engine, optimize, no_cache, buffer_size, input_file, input_column, max_steps, max_time, profile, profile_output, checkpoint_file, resume):
     # TODO: implement a basic interpreter througn command line
     if filename is None:
+        if resume is not None or checkpoint_file is not None:
+            raise click.UsageError("--resume and --checkpoint require --file")
         run_basic_repl(verbose=verbose)
+        return
+
+    if input_file is None:
+        if input_column is not None:
+            raise click.UsageError("--input-column requires --input-file")
+        inputs = None
+    elif input_column is not None:
+        inputs = BasicJSONLInput(input_file, input_column)
     else:
-        run_basic(filename, verbose=verbose)
+        inputs = BasicStreamInput(input_file)
+
+    run_basic(filename, verbose=verbose, engine=engine, optimize=optimize, use_cache=not no_cache, buffer_size=buffer_size, input=inputs,
+              max_steps=max_steps, max_time=max_time, profile=profile, profile_output=profile_output,
+              resume=resume, checkpoint_file=checkpoint_file)
+
+@interpreters.command()
+@click.argument("manifest", type=click.Path(exists=True))
+@click.option("--workers", "-j", type=int, default=None, help="Number of worker processes (default: one per CPU)")
+@click.option("--output", "-o", type=click.File("w"), default="-", help="File to write JSONL results to")
+@click.option("--engine", type=click.Choice(BASIC_ENGINES), default="tree", help="Execution engine for BASIC files")
+@click.option("-O", "optimize", is_flag=True, help="Fold constant expressions before running")
+@click.option("--max-steps", type=click.IntRange(min=0), default=None, help="Default limit on lines executed per job")
+@click.option("--max-time", type=click.FloatRange(min=0), default=None, help="Default limit on seconds per job")
+def basic_batch(manifest, workers, output, engine, optimize, max_steps, max_time):
+    jobs = read_basic_manifest(manifest)
+    for result in run_basic_batch(jobs, workers=workers, engine=engine, optimize=optimize, max_steps=max_steps, max_time=max_time):
+        output.write(json.dumps(result) + "\n")
 
 @interpreters.command()
 @click.argument("filename")
@@ -33,12 +76,15 @@ def lisp(filename, verbose):
     run_lisp(filename, verbose=verbose)
 
 @interpreters.command()
-@click.argument("filename")
+@click.argument("filename", type=click.Path(exists=True, dir_okay=False))
 @click.option("--verbose", is_flag=True, help="Enable verbose output")
-def lc3(filename, verbose):
-    run_lc3(filename, verbose=verbose)
+@click.option("--buffer-size", type=click.IntRange(min=0), default=8192, help="Characters of console output to buffer; 0 writes every character immediately")
+@click.option("--input-file", type=click.File("r"), default=None, help="Read keyboard input from a file ('-' for stdin)")
+def lc3(filename, verbose, buffer_size, input_file):
+    run_lc3(filename, verbose=verbose, input=input_file, buffer_size=buffer_size)
 
 interpreters.add_command(basic, "basic")
+interpreters.add_command(basic_batch, "basic-batch")
 interpreters.add_command(lisp, "lisp")
 interpreters.add_command(lc3, "lc3")
 
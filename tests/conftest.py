@@ -0,0 +1,43 @@
+"""
+tests/conftest.py
+Shared fixtures
+"""
+
+import pytest
+
+from interpreters.basic import BasicInterpreter
+from interpreters.basic.profiler import Profiler
+from interpreters.basic.streams import MemorySink
+
+@pytest.fixture
+def load_basic():
+    """
+    Load BASIC source into an interpreter that writes PRINT output to memory.
+
+    The returned function takes the source and the interpreter options:
+    engine, optimize, input (the INPUT values, none by default), tracer and
+    profile (install a Profiler). It returns the interpreter and its MemorySink.
+    """
+    def load(code, engine="tree", optimize=False, input=(), tracer=None, profile=False):
+        output = MemorySink()
+        interpreter = BasicInterpreter(engine=engine, optimize=optimize, output=output, input=list(input), tracer=tracer)
+        if profile:
+            interpreter.profiler = Profiler()
+        interpreter.load(code)
+        return interpreter, output
+
+    return load
+
+@pytest.fixture
+def run_basic(load_basic):
+    """
+    Run BASIC source to the end, taking the same options as load_basic.
+
+    The returned function returns the lines the program printed.
+    """
+    def run(code, **options):
+        interpreter, output = load_basic(code, **options)
+        interpreter.run()
+        return output.lines
+
+    return run
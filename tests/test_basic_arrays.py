@@ -0,0 +1,38 @@
+"""
+tests/test_basic_arrays.py
+BASIC arrays and the functions over them
+"""
+
+import pytest
+
+from interpreters.basic import ENGINES
+from interpreters.basic.errors import BasicRuntimeError
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_dim_and_element_let(run_basic, engine, optimize):
+    code = "10 DIM A(3), B(2)\n20 FOR I = 0 TO 3\n30 LET A(I) = I * I\n40 NEXT I\n50 LET B(2) = A(3) + 1\n60 PRINT A(2)\n70 PRINT B(2)\n80 PRINT B(0)\n"
+    assert run_basic(code, engine=engine, optimize=optimize) == ["4.0", "10.0", "0.0"]
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_array_functions(run_basic, engine, optimize):
+    code = "10 DIM A(3)\n20 LET A(0) = 4\n30 LET A(3) = -1\n40 PRINT SUM(A)\n50 PRINT MIN(A)\n60 PRINT MAX(A)\n"
+    assert run_basic(code, engine=engine, optimize=optimize) == ["3.0", "-1.0", "4.0"]
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("code, message", [
+    ("10 DIM A(3)\n20 PRINT A(4)\n", r"Index 4 out of range for array A\(3\)"),
+    ("10 DIM A(3)\n20 LET A(4) = 1\n", r"Index 4 out of range for array A\(3\)"),
+    ("10 DIM A(3)\n20 LET A(-1) = 1\n", r"Index -1 out of range for array A\(3\)"),
+    ("10 PRINT A(1)\n", "Array A is not dimensioned"),
+    ("10 LET A(1) = 2\n", "Array A is not dimensioned"),
+    ("10 PRINT SUM(A)\n", "Array A is not dimensioned"),
+    ('10 DIM A(2)\n20 LET A(1) = "x"\n', "Array A holds numbers"),
+    ("10 DIM A(-1)\n", "Invalid size for array A"),
+])
+def test_array_errors(load_basic, engine, optimize, code, message):
+    interpreter, output = load_basic(code, engine=engine, optimize=optimize)
+    with pytest.raises(BasicRuntimeError, match=message):
+        interpreter.run()
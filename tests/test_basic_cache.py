@@ -0,0 +1,31 @@
+"""
+tests/test_basic_cache.py
+Validation of the parsed program cache
+"""
+
+import interpreters.basic.cache as cache
+from interpreters.basic import BasicInterpreter
+
+CODE = '10 LET A = 1\n20 PRINT A\n'
+
+def write_cache(tmp_path):
+    """
+    Parse a program through the cache, returning its path.
+    """
+    file = tmp_path / "program.bas"
+    file.write_text(CODE)
+    BasicInterpreter().load_file(str(file))
+    return str(file)
+
+def test_cache_reused_for_same_source(tmp_path):
+    file = write_cache(tmp_path)
+    assert cache.load(file, CODE) is not None
+
+def test_cache_rejected_for_changed_source(tmp_path):
+    file = write_cache(tmp_path)
+    assert cache.load(file, CODE + '30 END\n') is None
+
+def test_cache_rejected_for_changed_parser(tmp_path, monkeypatch):
+    file = write_cache(tmp_path)
+    monkeypatch.setattr(cache, "parser_fingerprint", lambda: "another parser")
+    assert cache.load(file, CODE) is None
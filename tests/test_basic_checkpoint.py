@@ -0,0 +1,89 @@
+"""
+tests/test_basic_checkpoint.py
+Checkpoints of stopped BASIC runs
+"""
+
+import pytest
+
+import interpreters.basic.checkpoint as checkpoint
+from interpreters.basic import ENGINES
+from interpreters.basic.classes import RunResult
+from interpreters.basic.errors import BasicRuntimeError
+
+# A loop calling a subroutine that reads INPUT, so a stop can land inside both
+PROGRAM = """10 LET T = 0
+20 FOR I = 1 TO 4
+30 GOSUB 100
+40 PRINT T
+50 NEXT I
+60 END
+100 INPUT X
+110 LET T = T + X * I
+120 RETURN
+"""
+
+VALUES = [5, 7, 11, 13]
+
+@pytest.fixture
+def source(tmp_path):
+    """
+    Write the program to a file, as checkpoints hash the source of the file run.
+    """
+    file = tmp_path / "program.bas"
+    file.write_text(PROGRAM)
+    return str(file)
+
+def uninterrupted(load_basic, engine):
+    """
+    Get the output of the program run without stopping.
+    """
+    interpreter, output = load_basic(PROGRAM, engine=engine, input=VALUES)
+    assert interpreter.run().status == RunResult.FINISHED
+    return output.lines
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("stop", [3, 9, 14])
+def test_resume_matches_uninterrupted_run(load_basic, source, tmp_path, engine, stop):
+    path = str(tmp_path / "program.bchk")
+
+    interpreter, first = load_basic(PROGRAM, engine=engine, input=VALUES)
+    result = interpreter.run(max_steps=stop)
+    assert result.status == RunResult.STEP_LIMIT
+    assert result.steps == stop
+    checkpoint.save(path, source, interpreter.checkpoint())
+
+    # A new process starts from the same INPUT values, skipping those already read
+    resumed, second = load_basic(PROGRAM, engine=engine, input=VALUES)
+    resumed.restore(checkpoint.load(path, source))
+    result = resumed.resume()
+
+    assert result.status == RunResult.FINISHED
+    assert first.lines + second.lines == uninterrupted(load_basic, engine)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_restore_skips_input_read(load_basic, engine):
+    interpreter, output = load_basic(PROGRAM, engine=engine, input=VALUES)
+    interpreter.run(max_steps=10)
+    state = interpreter.checkpoint()
+    assert state["input_position"] == 2
+
+    resumed, output = load_basic(PROGRAM, engine=engine, input=VALUES)
+    resumed.restore(state)
+    assert resumed.environment.input.position == 2
+
+def test_rejects_changed_source(load_basic, source, tmp_path):
+    path = str(tmp_path / "program.bchk")
+    interpreter, output = load_basic(PROGRAM, input=VALUES)
+    interpreter.run(max_steps=5)
+    checkpoint.save(path, source, interpreter.checkpoint())
+
+    with open(source, 'a') as f:
+        f.write("130 PRINT T\n")
+    with pytest.raises(BasicRuntimeError, match="different version of"):
+        checkpoint.load(path, source)
+
+def test_rejects_unreadable_checkpoint(source, tmp_path):
+    path = tmp_path / "program.bchk"
+    path.write_bytes(b"not a checkpoint")
+    with pytest.raises(BasicRuntimeError, match="Cannot read checkpoint"):
+        checkpoint.load(str(path), source)
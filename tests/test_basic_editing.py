@@ -0,0 +1,62 @@
+"""
+tests/test_basic_editing.py
+Incremental editing of BASIC programs
+"""
+
+import pytest
+
+from interpreters.basic import ENGINES
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_added_lines_run_in_order(load_basic, engine):
+    interpreter, output = load_basic('20 PRINT "b"\n', engine=engine)
+    interpreter.add_line('40 PRINT "d"')
+    interpreter.add_line('10 PRINT "a"')
+    interpreter.add_line('30 PRINT "c"')
+
+    assert interpreter.line_numbers == [10, 20, 30, 40]
+    interpreter.run()
+    assert output.lines == ["a", "b", "c", "d"]
+
+def test_replaced_line_recompiled_alone(load_basic):
+    interpreter, output = load_basic('10 PRINT "a"\n20 PRINT "b"\n30 GOTO 50\n40 PRINT "skipped"\n50 PRINT "c"\n', engine="compiled")
+    interpreter.run()
+    code = list(interpreter._code)
+
+    interpreter.add_line('20 PRINT "B"')
+    assert interpreter._changed == {20}
+    interpreter.run()
+
+    assert output.lines == ["a", "b", "c", "a", "B", "c"]
+    changed = [index for index, (before, after) in enumerate(zip(code, interpreter._code)) if before is not after]
+    assert changed == [interpreter._line_index[20]]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_deleted_line_no_longer_runs(load_basic, engine):
+    interpreter, output = load_basic('10 PRINT "a"\n20 PRINT "b"\n30 PRINT "c"\n', engine=engine)
+    interpreter.run()
+
+    assert interpreter.delete_line(20)
+    assert not interpreter.delete_line(20)
+    assert interpreter.line_numbers == [10, 30]
+    interpreter.run()
+    assert output.lines == ["a", "b", "c", "a", "c"]
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_replaced_loop_relinked(load_basic, engine, optimize):
+    interpreter, output = load_basic("10 FOR I = 1 TO 2\n20 PRINT I\n30 NEXT I\n", engine=engine, optimize=optimize)
+    interpreter.run()
+
+    interpreter.add_line("10 FOR I = 5 TO 7")
+    interpreter.run()
+    assert output.lines == ["1", "2", "5", "6", "7"]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_edited_subroutine_called(load_basic, engine):
+    interpreter, output = load_basic('10 GOSUB 100\n20 END\n100 PRINT "old"\n110 RETURN\n', engine=engine, optimize=True)
+    interpreter.run()
+
+    interpreter.add_line('100 PRINT "new"')
+    interpreter.run()
+    assert output.lines == ["old", "new"]
@@ -0,0 +1,62 @@
+"""
+tests/test_basic_engines.py
+Parity of the tree and compiled BASIC engines
+"""
+
+import pytest
+
+from interpreters.basic import ENGINES
+from interpreters.basic.classes import RunResult
+from interpreters.basic.errors import BasicError
+
+# Programs whose output and ending must be the same on every engine
+PROGRAMS = {
+    "self goto": '10 LET A = 0\n20 GOTO 20\n30 PRINT "fell through"\n',
+    "self if": '10 LET A = 0\n30 LET A = A + 1\n35 IF A < 3 GOTO 30\n40 PRINT A\n',
+    "gosub next line": '10 GOSUB 20\n20 RETURN\n30 PRINT "after"\n',
+    "gosub and return": '10 GOSUB 40\n20 PRINT "back"\n30 END\n40 PRINT "sub"\n50 RETURN\n',
+    "empty for": '10 FOR I = 1 TO 5\n20 NEXT I\n30 PRINT I\n',
+    "empty while": '10 LET W = 0\n20 WHILE W < 3\n30 WEND\n40 PRINT "never"\n',
+    "while": '10 LET W = 0\n20 WHILE W < 3\n30 LET W = W + 1\n40 WEND\n50 PRINT W\n',
+}
+
+MAX_STEPS = 1000
+
+@pytest.fixture
+def run_program(load_basic):
+    """
+    Run a program with a step limit, returning its output and how it ended.
+    """
+    def run(code, engine, optimize=False):
+        interpreter, output = load_basic(code, engine=engine, optimize=optimize)
+        try:
+            result = interpreter.run(max_steps=MAX_STEPS)
+            ending = (result.status, result.steps, result.line)
+        except BasicError as e:
+            ending = ("error", str(e))
+        return output.lines, ending
+
+    return run
+
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("name", PROGRAMS)
+def test_engines_agree(run_program, name, optimize):
+    results = [run_program(PROGRAMS[name], engine, optimize) for engine in ENGINES]
+    assert all(result == results[0] for result in results)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_self_jump_loops(run_program, engine):
+    lines, ending = run_program(PROGRAMS["self goto"], engine)
+    assert lines == []
+    assert ending == (RunResult.STEP_LIMIT, MAX_STEPS, 20)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_self_if_repeats(run_program, engine):
+    lines, ending = run_program(PROGRAMS["self if"], engine)
+    assert lines == ["3"]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_gosub_next_line_returns_to_return(run_program, engine):
+    lines, ending = run_program(PROGRAMS["gosub next line"], engine)
+    assert lines == []
+    assert ending == ("error", "RETURN without GOSUB.")
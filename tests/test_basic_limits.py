@@ -0,0 +1,48 @@
+"""
+tests/test_basic_limits.py
+Step and time limits of BASIC runs
+"""
+
+import pytest
+
+from interpreters.basic import ENGINES, run
+from interpreters.basic.classes import RunResult
+
+# An infinite loop that never leaves its own line
+SELF_LOOP = '10 LET A = 0\n20 GOTO 20\n30 PRINT "fell through"\n'
+
+# An infinite loop through an IF that jumps to itself
+SELF_IF_LOOP = '10 LET A = 1\n20 IF A > 0 GOTO 20\n30 PRINT "fell through"\n'
+
+@pytest.mark.parametrize("code", [SELF_LOOP, SELF_IF_LOOP])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_step_limit_stops_self_loop(load_basic, engine, code):
+    interpreter, output = load_basic(code, engine=engine)
+    result = interpreter.run(max_steps=100000)
+
+    assert result.status == RunResult.STEP_LIMIT
+    assert result.steps == 100000
+    assert result.line == 20
+    assert output.lines == []
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_time_limit_stops_self_loop(load_basic, engine):
+    interpreter, output = load_basic(SELF_LOOP, engine=engine)
+    result = interpreter.run(max_time=0.05)
+
+    assert result.status == RunResult.TIME_LIMIT
+    assert result.line == 20
+    assert output.lines == []
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_reports_step_limit(engine, tmp_path, capsys):
+    file = tmp_path / "loop.bas"
+    file.write_text(SELF_LOOP)
+
+    with pytest.raises(SystemExit) as exit_info:
+        run(str(file), engine=engine, use_cache=False, max_steps=100000)
+
+    assert exit_info.value.code == 1
+    captured = capsys.readouterr()
+    assert "Step limit exceeded at line 20" in captured.err
+    assert "fell through" not in captured.out
@@ -0,0 +1,20 @@
+"""
+tests/test_basic_loops.py
+Runtime errors of BASIC loops
+"""
+
+import pytest
+
+from interpreters.basic import ENGINES
+from interpreters.basic.errors import BasicRuntimeError
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("step", ["", " STEP 2", " STEP -1", " STEP K"])
+def test_next_without_for(load_basic, engine, optimize, step):
+    code = f'5 LET I = 1\n6 LET K = 1\n10 GOTO 30\n20 FOR I = 1 TO 3{step}\n30 PRINT "body"\n40 NEXT I\n'
+    interpreter, output = load_basic(code, engine=engine, optimize=optimize)
+
+    with pytest.raises(BasicRuntimeError, match="NEXT without FOR"):
+        interpreter.run()
+    assert output.lines == ["body"]
@@ -0,0 +1,38 @@
+"""
+tests/test_basic_optimizer.py
+Identities simplified by the BASIC optimizer
+"""
+
+import pytest
+
+from interpreters.basic import ENGINES
+from interpreters.basic.classes import Operation
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("code", [
+    '10 LET A = 3\n20 PRINT (A > 1) * 1\n',
+    '10 LET A = 3\n20 PRINT 1 * (A > 1)\n',
+    '10 LET A = 3\n20 PRINT (A < 1) + 0\n',
+    '10 DIM X(2)\n20 LET X(1) = -0.0\n30 PRINT X(1) + 0\n',
+    '10 DIM X(2)\n20 LET X(1) = 2.5\n30 PRINT X(1) * 1 - 0\n',
+])
+def test_identities_keep_output(run_basic, code, engine):
+    assert run_basic(code, engine=engine, optimize=True) == run_basic(code, engine=engine, optimize=False)
+
+@pytest.mark.parametrize("code", [
+    '10 LET S = "hi"\n20 PRINT S + 0\n',
+    '10 LET S = "hi"\n20 PRINT S * 1\n',
+    '10 LET S = "hi"\n20 PRINT 0 + S\n',
+])
+def test_identities_skip_untyped_operands(load_basic, code):
+    interpreter, output = load_basic(code, optimize=True)
+    assert isinstance(interpreter.program[20].statement.expression, Operation)
+
+@pytest.mark.parametrize("code", [
+    '10 DIM X(2)\n20 PRINT X(1) * 1\n',
+    '10 DIM X(2)\n20 PRINT X(1) - 0\n',
+    '10 PRINT (2 * 3) + 0\n',
+])
+def test_identities_simplify_numbers(load_basic, code):
+    interpreter, output = load_basic(code, optimize=True)
+    assert not isinstance(interpreter.program[max(interpreter.program)].statement.expression, Operation)
@@ -0,0 +1,45 @@
+"""
+tests/test_basic_parser.py
+Parsing of BASIC expressions
+"""
+
+import pytest
+
+from interpreters.basic import ENGINES
+from interpreters.basic.errors import BasicSyntaxError
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("expression, printed", [
+    ("2*3+4", "10"),
+    ("2+3*4", "14"),
+    ("10-2-3", "5"),
+    ("(1+2)*3", "9"),
+    ("2-(3-4)", "3"),
+    ("-3+5", "2"),
+    ("-(2+3)*2", "-10"),
+    ("1+2*3-4/2", "5.0"),
+])
+def test_precedence_and_associativity(load_basic, engine, optimize, expression, printed):
+    interpreter, output = load_basic(f"10 PRINT {expression}\n", engine=engine, optimize=optimize)
+    interpreter.run()
+    assert output.lines == [printed]
+
+@pytest.mark.parametrize("expression, message", [
+    ("(1+2", "Mismatched parentheses"),
+    ("1+2)", "Mismatched parentheses"),
+    ("(1+2))*3", "Mismatched parentheses"),
+    ("(", "Mismatched parentheses"),
+    ("()", "Empty parentheses"),
+    ("2*()", "Empty parentheses"),
+])
+def test_parenthesis_errors(load_basic, expression, message):
+    with pytest.raises(BasicSyntaxError, match=message):
+        load_basic(f"10 PRINT {expression}\n")
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_long_expression(load_basic, engine):
+    terms = 5000
+    interpreter, output = load_basic("10 PRINT " + "+".join(["1"] * terms) + "\n", engine=engine)
+    interpreter.run()
+    assert output.lines == [str(terms)]
@@ -0,0 +1,36 @@
+"""
+tests/test_basic_streams.py
+Errors of the JSONL input source
+"""
+
+import io
+
+import pytest
+
+from interpreters.basic import BasicInterpreter
+from interpreters.basic.errors import BasicRuntimeError
+from interpreters.basic.streams import JSONLInput, MemorySink
+
+def test_reads_column():
+    source = JSONLInput(io.StringIO('{"x": 1}\n\n{"x": "two"}\n'), "x")
+    assert [source.read(), source.read()] == [1, "two"]
+    with pytest.raises(EOFError):
+        source.read()
+
+@pytest.mark.parametrize("text, message", [
+    ('{"x": 1}\n{"x": \n', "Input line 2 is not valid JSON"),
+    ('{"x": 1}\n\n[1, 2]\n', "Input line 3 is not a JSON object"),
+    ('"x"\n', "Input line 1 is not a JSON object"),
+    ('{"x": 1}\n{"y": 2}\n', "Input line 2 has no column 'x'"),
+])
+def test_bad_records_raise_runtime_errors(text, message):
+    source = JSONLInput(io.StringIO(text), "x")
+    with pytest.raises(BasicRuntimeError, match=message):
+        while True:
+            source.read()
+
+def test_bad_record_stops_run_cleanly():
+    interpreter = BasicInterpreter(output=MemorySink(), input=JSONLInput(io.StringIO("not json\n"), "x"))
+    interpreter.load("10 INPUT A\n20 PRINT A\n")
+    with pytest.raises(BasicRuntimeError, match="Input line 1"):
+        interpreter.run()
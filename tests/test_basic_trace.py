@@ -0,0 +1,81 @@
+"""
+tests/test_basic_trace.py
+Events reported to BASIC tracers
+"""
+
+import pytest
+
+from interpreters.basic import ENGINES
+from interpreters.basic.trace import Tracer
+
+PROGRAM = """10 DIM X(3)
+20 LET I = 2
+30 LET X(I) = 5
+40 GOSUB 100
+50 PRINT X(1)
+60 END
+100 LET X(1) = 7
+110 LET B = 3
+120 RETURN
+"""
+
+# The index variable changes after the element is stored, within the inlined subroutine
+INDEX_CHANGED = """10 DIM A(5)
+20 LET I = 1
+30 GOSUB 100
+40 END
+100 LET A(I) = 9
+110 LET I = I + 1
+120 RETURN
+"""
+
+class RecordingTracer(Tracer):
+    """
+    A tracer keeping the lines entered and the assignments reported.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.assignments = []
+
+    def line_enter(self, environment, line):
+        self.lines.append(line.linenum)
+
+    def assignment(self, environment, name, value):
+        self.assignments.append((name, value))
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_element_and_inlined_assignments(load_basic, engine, optimize):
+    tracer = RecordingTracer()
+    interpreter, output = load_basic(PROGRAM, engine=engine, optimize=optimize, tracer=tracer)
+    interpreter.run()
+    assert tracer.assignments == [("I", 2), ("X(2)", 5.0), ("X(1)", 7.0), ("B", 3)]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_tracer_runs_with_profiler(load_basic, engine):
+    tracer = RecordingTracer()
+    interpreter, output = load_basic(PROGRAM, engine=engine, tracer=tracer, profile=True)
+    interpreter.run()
+    assert tracer.lines == [10, 20, 30, 40, 100, 110, 120, 50, 60]
+    assert tracer.assignments == [("I", 2), ("X(2)", 5.0), ("X(1)", 7.0), ("B", 3)]
+    assert dict(interpreter.profiler.hits) == {line: 1 for line in tracer.lines}
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_element_reported_at_assignment_time(load_basic, engine, optimize):
+    tracer = RecordingTracer()
+    interpreter, output = load_basic(INDEX_CHANGED, engine=engine, optimize=optimize, tracer=tracer)
+    interpreter.run()
+    assert tracer.assignments == [("I", 1), ("A(1)", 9.0), ("I", 2)]
+
+def test_element_index_evaluated_once(load_basic):
+    evaluations = []
+    tracer = RecordingTracer()
+    interpreter, output = load_basic("10 DIM A(5)\n20 LET I = 1\n30 LET A(I + 1) = 5\n", tracer=tracer)
+    index = interpreter.program[30].statement.element.index
+    evaluate = index.evaluate
+    index.evaluate = lambda environment: evaluations.append(1) or evaluate(environment)
+    interpreter.run()
+    assert len(evaluations) == 1
+    assert tracer.assignments[-1] == ("A(2)", 5.0)
@@ -0,0 +1,31 @@
+"""
+tests/test_lc3_assembler.py
+Numeric literals and labels in the LC-3 assembler
+"""
+
+import pytest
+
+from interpreters.lc3.assembler import assemble, parse_number
+from interpreters.lc3.errors import AssemblyError
+
+@pytest.mark.parametrize("token, value", [
+    ("#10", 10), ("10", 10), ("-10", -10), ("#-10", -10),
+    ("x1F", 31), ("-x1F", -31), ("x-1", -1), ("b101", 5), ("b-11", -3),
+])
+def test_parse_number(token, value):
+    assert parse_number(token, 1, -0x8000, 0xFFFF) == value
+
+@pytest.mark.parametrize("label", ["FACE", "BAD", "DEAD", "A", "b1"])
+def test_hex_like_labels_are_labels(label):
+    image = assemble(f".ORIG x3000\nBR {label}\n.FILL {label}\n{label} HALT\n.END")
+    assert list(image.words) == [0x0E01, 0x3002, 0xF025]
+
+@pytest.mark.parametrize("operand", ["#1F", "b12", "1F", "x1G", "#"])
+def test_malformed_literals_are_assembly_errors(operand):
+    with pytest.raises(AssemblyError):
+        assemble(f".ORIG x3000\nADD R0, R0, {operand}\n.END")
+
+@pytest.mark.parametrize("line", ["LOOP FOO R1, R2", "FOO R1", "LOOP: BAR"])
+def test_unknown_instructions_are_assembly_errors(line):
+    with pytest.raises(AssemblyError, match="Unknown instruction"):
+        assemble(f".ORIG x3000\n{line}\nHALT\n.END")
@@ -0,0 +1,66 @@
+"""
+tests/test_lc3_loader.py
+Loading of LC-3 object files
+"""
+
+import pytest
+
+from interpreters.lc3.assembler import assemble
+from interpreters.lc3.environment import MEMORY_SIZE
+from interpreters.lc3.errors import ObjectFileError
+from interpreters.lc3.loader import is_object_file, load_file
+
+SOURCE = """
+    .ORIG x3000
+    LEA R0, MESSAGE
+    PUTS
+    HALT
+MESSAGE .STRINGZ "Hi"
+    .END
+"""
+
+def object_bytes(origin, words):
+    """
+    Encode an object file: the origin and then the words, each big-endian.
+    """
+    return b"".join(word.to_bytes(2, "big") for word in [origin, *words])
+
+def test_round_trip(tmp_path):
+    image = assemble(SOURCE)
+    file = tmp_path / "program.obj"
+    file.write_bytes(object_bytes(image.origin, image.words))
+
+    loaded = load_file(str(file))
+    assert loaded.origin == 0x3000
+    assert list(loaded.words) == list(image.words)
+
+@pytest.mark.parametrize("data, message", [
+    (b"", "Empty object file"),
+    (b"\x30", "Missing origin"),
+    (b"\x30\x00\x12", "odd number of bytes"),
+    (object_bytes(MEMORY_SIZE - 1, [0, 0]), "do not fit in memory"),
+])
+def test_rejects_invalid_files(tmp_path, data, message):
+    file = tmp_path / "program.obj"
+    file.write_bytes(data)
+    with pytest.raises(ObjectFileError, match=message):
+        load_file(str(file))
+
+def test_fills_memory_to_the_end(tmp_path):
+    file = tmp_path / "program.obj"
+    file.write_bytes(object_bytes(MEMORY_SIZE - 2, [1, 2]))
+    assert list(load_file(str(file)).words) == [1, 2]
+
+def test_detects_object_file_without_extension(tmp_path):
+    binary = tmp_path / "program"
+    binary.write_bytes(object_bytes(0x3000, assemble(SOURCE).words))
+    source = tmp_path / "program.txt"
+    source.write_text(SOURCE)
+
+    assert is_object_file(str(binary))
+    assert not is_object_file(str(source))
+
+def test_extension_marks_object_file(tmp_path):
+    file = tmp_path / "program.OBJ"
+    file.write_text(SOURCE)
+    assert is_object_file(str(file))
@@ -0,0 +1,131 @@
+"""
+tests/test_lc3_vm.py
+Halting and console traps of the LC-3 VM
+"""
+
+import io
+
+import pytest
+
+from interpreters.lc3.assembler import assemble
+from interpreters.lc3.console import Console, InputSource
+from interpreters.lc3.environment import Machine
+from interpreters.lc3.trap import IN_PROMPT
+from interpreters.lc3.vm import VM
+
+# Traps that return, followed by HALT
+PROGRAM = """
+    .ORIG x3000
+    GETC
+    OUT
+    ADD R0, R0, #1
+    HALT
+    .END
+"""
+
+def load_vm(source, input="", buffer_size=8192):
+    """
+    Assemble a program into a VM with a console in memory.
+    """
+    output = io.StringIO()
+    vm = VM(Machine(Console(input, stream=output, buffer_size=buffer_size)))
+    vm.load(assemble(source))
+    return vm, output
+
+def test_step_reports_only_halt():
+    vm, output = load_vm(PROGRAM, "a")
+    assert [vm.step() for _ in range(4)] == [False, False, False, True]
+    assert vm.machine.registers[0] == ord("b")
+    assert vm.machine.program_counter == 0x3004
+    assert output.getvalue() == "a"
+
+def test_run_halts():
+    vm, output = load_vm(PROGRAM, "a")
+    assert vm.run() is True
+    assert vm.steps == 4
+    assert vm.machine.program_counter == 0x3004
+    assert output.getvalue() == "a"
+
+class RecordingInput(InputSource):
+    """
+    An input source noting what had been written to the console when each character was read.
+    """
+
+    def __init__(self, chars, output):
+        self.chars = iter(chars)
+        self.output = output
+        self.written = []
+
+    def read_char(self):
+        self.written.append(self.output.getvalue())
+        return next(self.chars)
+
+def test_puts():
+    vm, output = load_vm("""
+        .ORIG x3000
+        LEA R0, MESSAGE
+        PUTS
+        HALT
+    MESSAGE .STRINGZ "Hello"
+        .END
+    """)
+    assert vm.run() is True
+    assert output.getvalue() == "Hello"
+
+@pytest.mark.parametrize("words, text", [
+    (["x6548", "x6C6C", "x006F"], "Hello"),
+    (["x6548", "x6C6C"], "Hell"),
+])
+def test_putsp_low_byte_first(words, text):
+    packed = "\n".join(f"    .FILL {word}" for word in words)
+    vm, output = load_vm(f"""
+        .ORIG x3000
+        LEA R0, MESSAGE
+        PUTSP
+        HALT
+    MESSAGE
+{packed}
+        .FILL x0000
+        .END
+    """)
+    assert vm.run() is True
+    assert output.getvalue() == text
+
+def test_in_prompts_and_echoes():
+    vm, output = load_vm("""
+        .ORIG x3000
+        IN
+        HALT
+        .END
+    """, "q")
+    assert vm.run() is True
+    assert vm.machine.registers[0] == ord("q")
+    assert output.getvalue() == IN_PROMPT + "q"
+
+def test_console_flushed_before_getc_and_on_halt():
+    output = io.StringIO()
+    input = RecordingInput("a", output)
+    vm = VM(Machine(Console(input, stream=output, buffer_size=1 << 20)))
+    vm.load(assemble("""
+        .ORIG x3000
+        LEA R0, PROMPT
+        PUTS
+        GETC
+        OUT
+        HALT
+    PROMPT .STRINGZ "Key? "
+        .END
+    """))
+
+    assert vm.run() is True
+    assert input.written == ["Key? "]
+    assert output.getvalue() == "Key? a"
+
+def test_console_buffers_until_flush():
+    vm, output = load_vm(PROGRAM, "a", buffer_size=1 << 20)
+    for _ in range(2):
+        vm.step()
+    assert output.getvalue() == ""
+    vm.step()
+    assert vm.step() is True
+    assert output.getvalue() == "a"